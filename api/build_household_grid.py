@@ -0,0 +1,140 @@
+"""
+Precompute household results over a grid of form inputs.
+
+Runs Baseline, Harris and Trump over every combination of state, marital
+status, number of children and income in the grid, one multi-household
+simulation per state and reform, and saves the results to
+data/household_grid.npz. Deploying the API afterwards bakes the grid into
+the image, and calculate answers grid hits without simulating.
+
+Usage: python api/build_household_grid.py [--income-max N] [--income-step N]
+       [--states CA NY ...]
+"""
+
+import argparse
+import itertools
+import json
+
+import numpy as np
+
+from modal_app import (
+    HOUSEHOLD_GRID,
+    LOCAL_HOUSEHOLD_GRID,
+    REFORM_NAMES,
+    get_results_fingerprint,
+    simulate_households,
+)
+
+# 50 states and DC, as offered by the dashboard form
+STATE_CODES = [
+    "AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DC", "DE", "FL",
+    "GA", "HI", "ID", "IL", "IN", "IA", "KS", "KY", "LA", "ME",
+    "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH",
+    "NJ", "NM", "NY", "NC", "ND", "OH", "OK", "OR", "PA", "RI",
+    "SC", "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI",
+    "WY",
+]  # fmt: skip
+
+
+def grid_households(grid, state):
+    """Household inputs for one state, in (married, children, income) order."""
+    households = []
+    for is_married, children, income in itertools.product(
+        grid["is_married"], grid["children"], grid["incomes"]
+    ):
+        households.append(
+            {
+                "state": state,
+                "is_married": is_married,
+                "child_ages": [grid["child_age"]] * children,
+                "income": income,
+                "head_age": grid["head_age"],
+                "spouse_age": grid["spouse_age"] if is_married else None,
+            }
+        )
+    return households
+
+
+def build_grid(grid):
+    states = grid["states"] or STATE_CODES
+    shape = (
+        len(states),
+        len(grid["is_married"]),
+        len(grid["children"]),
+        len(grid["incomes"]),
+    )
+
+    columns = {}
+    results = {reform_name: [] for reform_name in REFORM_NAMES}
+    diagnostics = {reform_name: {} for reform_name in REFORM_NAMES}
+    for state in states:
+        print(f"Simulating {state}...")
+        households = grid_households(grid, state)
+        for reform_name in REFORM_NAMES:
+            state_results, state_diagnostics = simulate_households(
+                reform_name, households
+            )
+            results[reform_name].append(state_results)
+            for household, household_diagnostics in zip(
+                households, state_diagnostics
+            ):
+                key = f"{state}/{bool(household['child_ages'])}"
+                diagnostics[reform_name].setdefault(key, household_diagnostics)
+            for result in state_results:
+                for column in result:
+                    columns.setdefault(column, len(columns))
+
+    arrays = {
+        "states": np.array(states),
+        "is_married": np.array(grid["is_married"]),
+        "children": np.array(grid["children"]),
+        "incomes": np.array(grid["incomes"], dtype=float),
+        "columns": np.array(list(columns)),
+        "scalars": np.array(
+            json.dumps(
+                {
+                    "head_age": grid["head_age"],
+                    "spouse_age": grid["spouse_age"],
+                    "child_age": grid["child_age"],
+                    "fingerprint": get_results_fingerprint(),
+                }
+            )
+        ),
+        "diagnostics": np.array(json.dumps(diagnostics)),
+    }
+    for reform_name in REFORM_NAMES:
+        values = np.full((*shape, len(columns)), np.nan)
+        flat = values.reshape(len(states), -1, len(columns))
+        for state_index, state_results in enumerate(results[reform_name]):
+            for row, result in enumerate(state_results):
+                for column, value in result.items():
+                    flat[state_index, row, columns[column]] = value
+        arrays[f"values.{reform_name}"] = values
+    return arrays
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--income-max", type=int)
+    parser.add_argument("--income-step", type=int)
+    parser.add_argument("--states", nargs="+")
+    args = parser.parse_args()
+
+    grid = dict(HOUSEHOLD_GRID)
+    if args.income_max is not None or args.income_step is not None:
+        income_max = args.income_max or grid["incomes"][-1]
+        income_step = args.income_step or (
+            grid["incomes"][1] - grid["incomes"][0]
+        )
+        grid["incomes"] = list(range(0, income_max + 1, income_step))
+    if args.states:
+        grid["states"] = [state.upper() for state in args.states]
+
+    arrays = build_grid(grid)
+    LOCAL_HOUSEHOLD_GRID.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(LOCAL_HOUSEHOLD_GRID, **arrays)
+    print(f"Saved household grid to {LOCAL_HOUSEHOLD_GRID}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,28 @@ Modal API backend for the 2024 Election Dashboard.
 Runs PolicyEngine US microsimulations for Baseline, Harris, and Trump tax plans.
 """
 
+import collections
+import contextlib
+import functools
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
 import modal
 
 app = modal.App("election-dashboard")
 
+# Precomputed household results built by api/build_household_grid.py
+HOUSEHOLD_GRID_FILE = "household_grid.npz"
+LOCAL_HOUSEHOLD_GRID = (
+    Path(__file__).resolve().parents[1] / "data" / HOUSEHOLD_GRID_FILE
+)
+REMOTE_HOUSEHOLD_GRID = Path("/root/data") / HOUSEHOLD_GRID_FILE
+
 image = (
     modal.Image.debian_slim(python_version="3.12")
     .pip_install(
@@ -18,6 +36,10 @@ image = (
         "pyyaml",
     )
 )
+if LOCAL_HOUSEHOLD_GRID.exists():
+    image = image.add_local_file(
+        LOCAL_HOUSEHOLD_GRID, str(REMOTE_HOUSEHOLD_GRID)
+    )
 
 COMBINED_REFORMS = {
     "Baseline": None,
@@ -125,6 +147,87 @@ COMBINED_REFORMS = {
 
 YEAR = "2025"
 
+REFORM_NAMES = ["Baseline", "Harris", "Trump"]
+
+# "parallel" runs each reform in its own container, "serial" runs them
+# one after another in the calling container.
+EXECUTION_MODES = ("parallel", "serial")
+
+# Households per Simulation in calculate_batch. Each chunk runs in its own
+# container, so this trades per-simulation vectorization against fan-out.
+BATCH_CHUNK_SIZE = 1000
+
+# In-memory result cache entries per container. RESULT_CACHE_BACKING can be
+# "modal" to share results through a Modal Dict or "disk" to persist them
+# in a shelve file at RESULT_CACHE_PATH.
+RESULT_CACHE_SIZE = 4096
+RESULT_CACHE_DICT = "election-dashboard-results"
+
+# Modal Dict that containers publish their stage timing histograms to, one
+# entry per container, so the metrics endpoint can report all of them.
+# Containers publish at most every METRICS_PUBLISH_INTERVAL seconds, off the
+# request path, and once more on exit. Entries not updated for
+# METRICS_RETENTION seconds are folded into the RETIRED_METRICS_KEY entry.
+METRICS_DICT = "election-dashboard-metrics"
+METRICS_PUBLISH_INTERVAL = 15
+METRICS_RETENTION = 3600
+RETIRED_METRICS_KEY = "retired"
+
+# Version of how results are computed and shaped, part of every stored
+# result's key. Bump it when create_situation, the tip and overtime
+# handling or the result format changes, so stored results are not reused.
+RESULT_SCHEMA_VERSION = 1
+
+# Refundable credits that only households with children can receive, so
+# they are skipped for childless households. Each entry is checked against
+# the credit's eligibility rules. Dependent care, dependent exemption and
+# combined family credits can also go to adult dependents, disabled spouses
+# or childless workers, so they are left out and always calculated.
+# Similar-looking names are not enough: wv_sctc is a senior citizen credit.
+CHILD_ONLY_CREDITS = frozenset(
+    {
+        "refundable_ctc",
+        "ca_yctc",
+        "co_ctc",
+        "dc_ctc",
+        "dc_kccatc",
+        "il_ctc",
+        "md_ctc",
+        "ne_refundable_ctc",
+        "nm_ctc",
+        "ny_ctc",
+        "vt_ctc",
+    }
+)
+
+# Upper bounds in seconds of the per-stage timing histogram buckets
+TIMING_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Default and maximum number of points on a net income curve
+CURVE_POINTS = 201
+MAX_CURVE_POINTS = 1001
+
+# Inputs the household grid covers; every other input must be zero
+GRID_INPUTS = (
+    "state",
+    "is_married",
+    "child_ages",
+    "income",
+    "head_age",
+    "spouse_age",
+)
+
+# Default household grid, matching the dashboard form's defaults
+HOUSEHOLD_GRID = {
+    "states": None,  # None means all 50 states and DC
+    "is_married": [False, True],
+    "children": [0, 1, 2, 3],
+    "incomes": list(range(0, 200_001, 2_500)),
+    "head_age": 35,
+    "spouse_age": 35,
+    "child_age": 5,
+}
+
 
 def create_situation(
     state,
@@ -220,41 +323,113 @@ def create_situation(
     return situation
 
 
-def calculate_values(categories, simulation, year):
-    result_dict = {}
-    for category in categories:
-        try:
-            amount = float(
-                simulation.calculate(category, year, map_to="household")[0]
-            )
-            result_dict[category] = amount
-        except Exception:
-            result_dict[category] = 0.0
-    return result_dict
+@functools.lru_cache(maxsize=None)
+def get_reform(reform_name):
+    """Compile a reform from COMBINED_REFORMS once per container."""
+    from policyengine_core.reforms import Reform
+
+    start = time.perf_counter()
+    reform = Reform.from_dict(COMBINED_REFORMS[reform_name], country_id="us")
+    print(
+        f"Compiled {reform_name} reform in "
+        f"{time.perf_counter() - start:.3f}s"
+    )
+    return reform
 
 
-def run_simulation(reform_name, inputs):
-    from policyengine_us import Simulation
-    from policyengine_core.reforms import Reform
-    import pkg_resources
+@functools.lru_cache(maxsize=None)
+def get_tax_benefit_system(reform_name):
+    """Build the tax-benefit system for a reform once per container."""
+    from policyengine_us import CountryTaxBenefitSystem
+
+    start = time.perf_counter()
+    if reform_name == "Baseline":
+        system = CountryTaxBenefitSystem()
+    else:
+        system = CountryTaxBenefitSystem(reform=get_reform(reform_name))
+    print(
+        f"Built {reform_name} tax-benefit system in "
+        f"{time.perf_counter() - start:.3f}s"
+    )
+    return system
+
+
+def _newest_credit_list(resource):
     import yaml
 
-    state = inputs["state"]
-    is_married = inputs["is_married"]
-    child_ages = inputs.get("child_ages", [])
-    income = inputs.get("income", 0)
-    social_security_retirement = inputs.get("social_security_retirement", 0)
-    head_age = inputs.get("head_age", 35)
-    spouse_age = inputs.get("spouse_age", None)
-    tip_income = inputs.get("tip_income", 0)
-    overtime_income = inputs.get("overtime_income", 0)
-    medical_expenses = inputs.get("medical_expenses", 0)
-    real_estate_taxes = inputs.get("real_estate_taxes", 0)
-    interest_expense = inputs.get("interest_expense", 0)
-    charitable_cash = inputs.get("charitable_cash", 0)
-    charitable_non_cash = inputs.get("charitable_non_cash", 0)
-    qualified_business_income = inputs.get("qualified_business_income", 0)
-    casualty_loss = inputs.get("casualty_loss", 0)
+    with resource.open("r") as yaml_file:
+        data = yaml.safe_load(yaml_file)
+    newest_year = max(data["values"].keys())
+    return data["values"].get(newest_year, []) or []
+
+
+@functools.lru_cache(maxsize=None)
+def get_refundable_credit_index():
+    """Index the federal and per-state refundable credit variables.
+
+    The parameter YAML files are read once per container, so requests
+    only look credits up in memory.
+    """
+    from importlib import resources
+
+    parameters = resources.files("policyengine_us") / "parameters"
+    federal_credits = _newest_credit_list(
+        parameters / "gov" / "irs" / "credits" / "refundable.yaml"
+    )
+
+    state_credits = {}
+    for state_dir in (parameters / "gov" / "states").iterdir():
+        state_file = (
+            state_dir / "tax" / "income" / "credits" / "refundable.yaml"
+        )
+        if state_file.is_file():
+            state_credits[state_dir.name.upper()] = tuple(
+                _newest_credit_list(state_file)
+            )
+
+    return {"federal": tuple(federal_credits), "states": state_credits}
+
+
+def get_refundable_credits(state):
+    """Return the (federal, state) refundable credit variables for a state."""
+    index = get_refundable_credit_index()
+    return (
+        list(index["federal"]),
+        list(index["states"].get(state.upper(), ())),
+    )
+
+
+def normalize_inputs(inputs):
+    """Fill in defaults for a household's form inputs."""
+    return {
+        "state": inputs["state"],
+        "is_married": inputs["is_married"],
+        "child_ages": list(inputs.get("child_ages", [])),
+        "income": inputs.get("income", 0),
+        "social_security_retirement": inputs.get(
+            "social_security_retirement", 0
+        ),
+        "head_age": inputs.get("head_age", 35),
+        "spouse_age": inputs.get("spouse_age", None),
+        "tip_income": inputs.get("tip_income", 0),
+        "overtime_income": inputs.get("overtime_income", 0),
+        "medical_expenses": inputs.get("medical_expenses", 0),
+        "real_estate_taxes": inputs.get("real_estate_taxes", 0),
+        "interest_expense": inputs.get("interest_expense", 0),
+        "charitable_cash": inputs.get("charitable_cash", 0),
+        "charitable_non_cash": inputs.get("charitable_non_cash", 0),
+        "qualified_business_income": inputs.get(
+            "qualified_business_income", 0
+        ),
+        "casualty_loss": inputs.get("casualty_loss", 0),
+    }
+
+
+def create_reform_situation(reform_name, household):
+    """Build the situation for a normalized household under a reform."""
+    income = household["income"]
+    tip_income = household["tip_income"]
+    overtime_income = household["overtime_income"]
 
     # Adjust incomes based on reform
     if reform_name == "Baseline":
@@ -267,101 +442,1009 @@ def run_simulation(reform_name, inputs):
             total_income += overtime_income
             overtime_income = 0
 
-    situation = create_situation(
-        state=state,
-        is_married=is_married,
-        child_ages=child_ages,
+    return create_situation(
+        state=household["state"],
+        is_married=household["is_married"],
+        child_ages=household["child_ages"],
         income=total_income,
-        social_security_retirement=social_security_retirement,
-        head_age=head_age,
-        spouse_age=spouse_age,
-        medical_expenses=medical_expenses,
-        real_estate_taxes=real_estate_taxes,
-        interest_expense=interest_expense,
-        charitable_cash=charitable_cash,
-        charitable_non_cash=charitable_non_cash,
-        qualified_business_income=qualified_business_income,
-        casualty_loss=casualty_loss,
+        social_security_retirement=household["social_security_retirement"],
+        head_age=household["head_age"],
+        spouse_age=household["spouse_age"],
+        medical_expenses=household["medical_expenses"],
+        real_estate_taxes=household["real_estate_taxes"],
+        interest_expense=household["interest_expense"],
+        charitable_cash=household["charitable_cash"],
+        charitable_non_cash=household["charitable_non_cash"],
+        qualified_business_income=household["qualified_business_income"],
+        casualty_loss=household["casualty_loss"],
         tip_income=tip_income,
         overtime_income=overtime_income,
         reform_name=reform_name,
     )
 
-    if reform_name == "Baseline":
-        simulation = Simulation(situation=situation)
+
+def canonical_inputs(household):
+    """Reduce normalized inputs to a canonical form for cache keys."""
+    canonical = {
+        name: float(value) if isinstance(value, (int, float)) else value
+        for name, value in household.items()
+        if name not in ("is_married", "child_ages", "spouse_age")
+    }
+    canonical["state"] = household["state"].upper()
+    canonical["is_married"] = bool(household["is_married"])
+    canonical["child_ages"] = sorted(
+        float(age) for age in household["child_ages"]
+    )
+    # The spouse is only modelled for married households
+    canonical["spouse_age"] = (
+        float(household["spouse_age"])
+        if household["is_married"] and household["spouse_age"] is not None
+        else None
+    )
+    return canonical
+
+
+@functools.lru_cache(maxsize=None)
+def get_policyengine_version():
+    from importlib.metadata import version
+
+    return version("policyengine-us")
+
+
+@functools.lru_cache(maxsize=None)
+def get_reform_hash(reform_name):
+    """Hash a reform's parameter changes in COMBINED_REFORMS."""
+    payload = json.dumps(
+        COMBINED_REFORMS[reform_name], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def result_cache_key(reform_name, inputs):
+    """Hash the normalized inputs, the reform and everything results use.
+
+    Besides the inputs, the key covers the reform's parameters, the model
+    version and RESULT_SCHEMA_VERSION, so stored results from an earlier
+    deploy are not served after any of them change.
+    """
+    payload = json.dumps(
+        {
+            "inputs": canonical_inputs(normalize_inputs(inputs)),
+            "reform": reform_name,
+            "reform_hash": get_reform_hash(reform_name),
+            "policyengine_us": get_policyengine_version(),
+            "schema": RESULT_SCHEMA_VERSION,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def get_results_fingerprint():
+    """Hash every reform's parameters, the model version and the schema.
+
+    Stored with the household grid so a grid built by an earlier deploy is
+    not served. RESULT_SCHEMA_VERSION stands in for the result columns.
+    """
+    payload = json.dumps(
+        {
+            "reform_hashes": {
+                reform_name: get_reform_hash(reform_name)
+                for reform_name in REFORM_NAMES
+            },
+            "policyengine_us": get_policyengine_version(),
+            "schema": RESULT_SCHEMA_VERSION,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """LRU cache of reform results with an optional shared backing store."""
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE, backing=None):
+        self.maxsize = maxsize
+        self.backing = backing
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+
+    def get(self, key):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        if self.backing is not None:
+            value = self.backing.get(key)
+            if value is not None:
+                self._remember(key, value)
+                self.hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    def set(self, key, value):
+        self._remember(key, value)
+        if self.backing is not None:
+            self.backing[key] = value
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+        }
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+@functools.lru_cache(maxsize=None)
+def get_result_cache():
+    backing_name = os.environ.get("RESULT_CACHE_BACKING", "")
+    if backing_name == "modal":
+        backing = modal.Dict.from_name(
+            RESULT_CACHE_DICT, create_if_missing=True
+        )
+    elif backing_name == "disk":
+        import shelve
+
+        backing = shelve.open(
+            os.environ.get(
+                "RESULT_CACHE_PATH", "/tmp/election-dashboard-results"
+            )
+        )
     else:
-        reform_dict = COMBINED_REFORMS.get(reform_name, {})
-        reform = Reform.from_dict(reform_dict, country_id="us")
-        simulation = Simulation(reform=reform, situation=situation)
+        backing = None
+    return ResultCache(backing=backing)
+
+
+class StageTimings:
+    """Wall-clock seconds spent in each stage of one reform's simulation.
+
+    Stages are import, reform, system, simulation, headline,
+    credit_lists and credits. Cached stages still appear, with the
+    near-zero time of the cache hit.
+    """
+
+    def __init__(self):
+        self.seconds = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.seconds[name] = self.seconds.get(name, 0.0) + elapsed
+
+
+class StageHistograms:
+    """Prometheus-style histograms of stage timings by reform and stage."""
+
+    def __init__(self, buckets=TIMING_BUCKETS):
+        self.buckets = buckets
+        self.series = {}
+        self.published_at = 0.0
 
-    household_net_income = float(
-        simulation.calculate("household_net_income", YEAR)[0]
+    def observe(self, reform_name, seconds):
+        for stage, elapsed in seconds.items():
+            series = self.series.setdefault(
+                (reform_name, stage),
+                {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0},
+            )
+            for i, bound in enumerate(self.buckets):
+                if elapsed <= bound:
+                    series["buckets"][i] += 1
+            series["sum"] += elapsed
+            series["count"] += 1
+
+    def dump(self):
+        """Return the series as a list that can be stored and merged."""
+        return [
+            [reform_name, stage, series]
+            for (reform_name, stage), series in self.series.items()
+        ]
+
+    def merge(self, dumped):
+        """Add series from another container's dump to these histograms."""
+        for reform_name, stage, other in dumped:
+            series = self.series.setdefault(
+                (reform_name, stage),
+                {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0},
+            )
+            for i, count in enumerate(other["buckets"]):
+                series["buckets"][i] += count
+            series["sum"] += other["sum"]
+            series["count"] += other["count"]
+
+    def render(self):
+        """Render the histograms in the Prometheus text exposition format."""
+        name = "election_dashboard_stage_seconds"
+        lines = [
+            f"# HELP {name} Seconds spent in each stage of a reform "
+            "simulation.",
+            f"# TYPE {name} histogram",
+        ]
+        for (reform_name, stage), series in sorted(self.series.items()):
+            labels = f'reform="{reform_name}",stage="{stage}"'
+            for bound, count in zip(self.buckets, series["buckets"]):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(
+                f'{name}_bucket{{{labels},le="+Inf"}} {series["count"]}'
+            )
+            lines.append(f"{name}_sum{{{labels}}} {series['sum']}")
+            lines.append(f"{name}_count{{{labels}}} {series['count']}")
+        return "\n".join(lines) + "\n"
+
+
+@functools.lru_cache(maxsize=None)
+def get_stage_histograms():
+    """Return this container's stage timing histograms."""
+    return StageHistograms()
+
+
+def record_timings(reform_name, seconds):
+    """Log a reform's stage timings as JSON and add them to the histograms."""
+    print(
+        json.dumps(
+            {
+                "event": "stage_timings",
+                "reform": reform_name,
+                "seconds": {
+                    stage: round(elapsed, 6)
+                    for stage, elapsed in seconds.items()
+                },
+            }
+        )
     )
-    household_refundable_tax_credits = float(
-        simulation.calculate("household_refundable_tax_credits", YEAR)[0]
+    get_stage_histograms().observe(reform_name, seconds)
+
+
+@functools.lru_cache(maxsize=None)
+def get_metrics_store():
+    return modal.Dict.from_name(METRICS_DICT, create_if_missing=True)
+
+
+def publish_stage_histograms(wait=False):
+    """Store this container's histograms where the metrics endpoint reads.
+
+    Histograms only count up, so each container overwrites its own entry
+    and the endpoint sums the entries of every container there has been.
+    Unless wait is set, this publishes at most every
+    METRICS_PUBLISH_INTERVAL seconds, from a background thread.
+    """
+    if modal.is_local():
+        return
+    histograms = get_stage_histograms()
+    now = time.time()
+    if not wait and now - histograms.published_at < METRICS_PUBLISH_INTERVAL:
+        return
+    histograms.published_at = now
+    arguments = (
+        os.environ.get("MODAL_TASK_ID", "unknown"),
+        {"updated": now, "series": histograms.dump()},
     )
-    household_tax_before_refundable_credits = float(
-        simulation.calculate(
+    if wait:
+        get_metrics_store().put(*arguments)
+    else:
+        threading.Thread(
+            target=get_metrics_store().put, args=arguments, daemon=True
+        ).start()
+
+
+def compact_metrics_store(store):
+    """Fold entries of containers that stopped publishing into one entry.
+
+    Folding keeps the summed counts from dropping when a container goes
+    away, while the store stays bounded by the live containers.
+    """
+    cutoff = time.time() - METRICS_RETENTION
+    retired = None
+    for key, entry in list(store.items()):
+        if key == RETIRED_METRICS_KEY or entry["updated"] >= cutoff:
+            continue
+        if retired is None:
+            retired = StageHistograms()
+            previous = store.get(RETIRED_METRICS_KEY)
+            if previous is not None:
+                retired.merge(previous["series"])
+        try:
+            retired.merge(store.pop(key)["series"])
+        except KeyError:
+            # Another metrics request folded it first
+            continue
+    if retired is not None:
+        store.put(
+            RETIRED_METRICS_KEY,
+            {"updated": time.time(), "series": retired.dump()},
+        )
+
+
+def combine_situations(situations):
+    """Merge single-household situations into one multi-household situation.
+
+    Entity and member ids are prefixed with the household's position so
+    that the i-th household maps to row i of household-level outputs.
+    """
+    combined = {}
+    for i, situation in enumerate(situations):
+        prefix = f"h{i}_"
+        for unit, entities in situation.items():
+            for key, entity in entities.items():
+                entity = dict(entity)
+                if "members" in entity:
+                    entity["members"] = [
+                        prefix + member for member in entity["members"]
+                    ]
+                combined.setdefault(unit, {})[prefix + key] = entity
+    return combined
+
+
+@functools.lru_cache(maxsize=None)
+def get_credit_applicability(reform_name, state, has_children):
+    """Split a household type's refundable credits into evaluated and skipped.
+
+    Returns a tuple of variables to calculate and a dict mapping each
+    skipped variable to the reason it cannot be nonzero.
+    """
+    variables = get_tax_benefit_system(reform_name).variables
+    federal_credits, state_credits = get_refundable_credits(state)
+
+    evaluate = []
+    skipped = {}
+    for category in dict.fromkeys(federal_credits + state_credits):
+        if category not in variables:
+            skipped[category] = "not defined in policyengine-us"
+        elif not has_children and category in CHILD_ONLY_CREDITS:
+            skipped[category] = "requires children"
+        else:
+            evaluate.append(category)
+    return tuple(evaluate), skipped
+
+
+def calculate_values(categories, simulation, year, count=1):
+    """Calculate household-level arrays for each variable in categories.
+
+    Variables that fail are returned as zeros and also reported in the
+    second return value, mapped to their error message.
+    """
+    import numpy as np
+
+    result_dict = {}
+    failed = {}
+    for category in categories:
+        try:
+            result_dict[category] = simulation.calculate(
+                category, year, map_to="household"
+            )
+        except Exception as error:
+            result_dict[category] = np.zeros(count)
+            failed[category] = f"{type(error).__name__}: {error}"
+    return result_dict, failed
+
+
+def build_simulation(reform_name, households, timings=None):
+    """Build one Simulation over normalized households under a reform.
+
+    Stage times are added to timings if given. Returns the simulation and
+    the situation it was built from.
+    """
+    if timings is None:
+        timings = StageTimings()
+
+    with timings.stage("import"):
+        from policyengine_us import Simulation
+
+    situations = [
+        create_reform_situation(reform_name, household)
+        for household in households
+    ]
+    if len(situations) == 1:
+        situation = situations[0]
+    else:
+        situation = combine_situations(situations)
+
+    if reform_name != "Baseline":
+        with timings.stage("reform"):
+            get_reform(reform_name)
+    with timings.stage("system"):
+        system = get_tax_benefit_system(reform_name)
+    with timings.stage("simulation"):
+        simulation = Simulation(tax_benefit_system=system, situation=situation)
+    return simulation, situation
+
+
+def collect_results(reform_name, households, simulation, timings=None):
+    """Read each household's headline values and credits from a simulation.
+
+    Stage times are added to timings if given. Returns a list of result
+    dicts and a list of credit diagnostics (skipped and failed variables),
+    one per household in input order.
+    """
+    if timings is None:
+        timings = StageTimings()
+
+    with timings.stage("headline"):
+        household_net_income = simulation.calculate(
+            "household_net_income", YEAR
+        )
+        household_refundable_tax_credits = simulation.calculate(
+            "household_refundable_tax_credits", YEAR
+        )
+        household_tax_before_refundable_credits = simulation.calculate(
             "household_tax_before_refundable_credits", YEAR
-        )[0]
+        )
+
+    with timings.stage("credit_lists"):
+        applicability = {}
+        for household in households:
+            key = (household["state"], bool(household["child_ages"]))
+            if key not in applicability:
+                applicability[key] = get_credit_applicability(
+                    reform_name, *key
+                )
+    categories = list(
+        dict.fromkeys(
+            category
+            for evaluate, _ in applicability.values()
+            for category in evaluate
+        )
     )
+    with timings.stage("credits"):
+        credit_values, failed = calculate_values(
+            categories, simulation, YEAR, count=len(households)
+        )
+
+    results = []
+    diagnostics = []
+    for i, household in enumerate(households):
+        federal_credits, state_credits = get_refundable_credits(
+            household["state"]
+        )
+        evaluate, skipped = applicability[
+            (household["state"], bool(household["child_ages"]))
+        ]
+        results.append(
+            {
+                "Household Net Income": float(household_net_income[i]),
+                "Income Tax Before Credits": float(
+                    household_tax_before_refundable_credits[i]
+                ),
+                "Refundable Tax Credits": float(
+                    household_refundable_tax_credits[i]
+                ),
+                **{
+                    category: (
+                        0.0
+                        if category in skipped
+                        else float(credit_values[category][i])
+                    )
+                    for category in federal_credits + state_credits
+                },
+            }
+        )
+        diagnostics.append(
+            {
+                "skipped": dict(skipped),
+                "failed": {
+                    category: failed[category]
+                    for category in evaluate
+                    if category in failed
+                },
+            }
+        )
+    return results, diagnostics
 
-    # Load credit categories
-    package = "policyengine_us"
-    resource_path_federal = "parameters/gov/irs/credits/refundable.yaml"
-    resource_path_state = (
-        f"parameters/gov/states/{state.lower()}/tax/income/credits/"
-        f"refundable.yaml"
+
+def simulate_households(reform_name, households, timings=None):
+    """Run one vectorized simulation over a list of household inputs.
+
+    Stage times are added to timings if given. Returns a list of result
+    dicts and a list of credit diagnostics, one per household in input
+    order.
+    """
+    households = [normalize_inputs(inputs) for inputs in households]
+    simulation, _ = build_simulation(
+        reform_name, households, timings=timings
     )
+    return collect_results(reform_name, households, simulation, timings)
 
-    def load_credits_from_yaml(pkg, path):
-        yaml_file = pkg_resources.resource_stream(pkg, path)
-        data = yaml.safe_load(yaml_file)
-        newest_year = max(data["values"].keys())
-        return data["values"].get(newest_year, [])
 
-    try:
-        federal_credits = load_credits_from_yaml(
-            package, resource_path_federal
+def simulate_curve(reform_name, inputs, income_min, income_max, count):
+    """Vary employment income over an axis in one vectorized simulation.
+
+    The axis runs over the form's income from income_min to income_max.
+    Each reform's tip and overtime adjustments are added on top, as in
+    run_simulation. Returns a dict of per-point lists for each result
+    column, and the credit diagnostics.
+    """
+    from policyengine_us import Simulation
+
+    household = normalize_inputs({**inputs, "income": 0})
+    situation = create_reform_situation(reform_name, household)
+    # With zero income, the head's employment income is the reform's offset
+    offset = situation["people"]["adult"]["employment_income"][YEAR]
+    situation["axes"] = [
+        [
+            {
+                "name": "employment_income",
+                "period": YEAR,
+                "min": income_min + offset,
+                "max": income_max + offset,
+                "count": count,
+            }
+        ]
+    ]
+
+    simulation = Simulation(
+        tax_benefit_system=get_tax_benefit_system(reform_name),
+        situation=situation,
+    )
+    results, diagnostics = collect_results(
+        reform_name, [household] * count, simulation
+    )
+    curve = {
+        column: [result[column] for result in results]
+        for column in results[0]
+    }
+    return {"result": curve, "diagnostics": diagnostics[0]}
+
+
+def run_simulation(reform_name, inputs):
+    results, _ = simulate_households(reform_name, [inputs])
+    return results[0]
+
+
+class HouseholdGrid:
+    """Precomputed results for every household on a grid of form inputs.
+
+    Values for each reform are stored in one array indexed by (state,
+    marital status, number of children, income, result column). NaN marks
+    result columns that do not apply in a state.
+    """
+
+    def __init__(self, arrays):
+        self.states = [str(state) for state in arrays["states"]]
+        self.is_married = [bool(value) for value in arrays["is_married"]]
+        self.children = [int(value) for value in arrays["children"]]
+        self.incomes = arrays["incomes"]
+        self.columns = [str(column) for column in arrays["columns"]]
+        self.scalars = json.loads(str(arrays["scalars"]))
+        self.diagnostics = json.loads(str(arrays["diagnostics"]))
+        self.values = {
+            reform_name: arrays[f"values.{reform_name}"]
+            for reform_name in REFORM_NAMES
+        }
+        self._state_index = {state: i for i, state in enumerate(self.states)}
+        self._income_index = {
+            float(income): i for i, income in enumerate(self.incomes)
+        }
+
+    @classmethod
+    def load(cls, path):
+        import numpy as np
+
+        with np.load(path) as arrays:
+            return cls({key: arrays[key] for key in arrays.files})
+
+    def locate(self, household, interpolate=False):
+        """Find a household's grid cell.
+
+        Returns the (state, married, children) indices with a list of
+        (income index, weight) pairs, or None if the household is off the
+        grid. Off-grid incomes within range are bracketed when
+        interpolating.
+        """
+        import numpy as np
+
+        if any(
+            value
+            for name, value in household.items()
+            if name not in GRID_INPUTS
+        ):
+            return None
+        if household["head_age"] != self.scalars["head_age"]:
+            return None
+        child_age = self.scalars["child_age"]
+        if any(age != child_age for age in household["child_ages"]):
+            return None
+        is_married = bool(household["is_married"])
+        spouse_age = self.scalars["spouse_age"]
+        if is_married and household["spouse_age"] != spouse_age:
+            return None
+        if (
+            household["state"] not in self._state_index
+            or is_married not in self.is_married
+            or len(household["child_ages"]) not in self.children
+        ):
+            return None
+        cell = (
+            self._state_index[household["state"]],
+            self.is_married.index(is_married),
+            self.children.index(len(household["child_ages"])),
+        )
+
+        income = float(household["income"])
+        if income in self._income_index:
+            return cell, [(self._income_index[income], 1.0)]
+        if not interpolate or not (
+            self.incomes[0] < income < self.incomes[-1]
+        ):
+            return None
+        upper = int(np.searchsorted(self.incomes, income))
+        lower = upper - 1
+        weight = (income - self.incomes[lower]) / (
+            self.incomes[upper] - self.incomes[lower]
+        )
+        return cell, [(lower, 1 - weight), (upper, weight)]
+
+    def lookup(self, inputs, interpolate=False):
+        """Look a household up on the grid.
+
+        Returns {reform: {"result", "diagnostics"}} entries and whether
+        they were interpolated, or None if the household is off the grid.
+        """
+        import numpy as np
+
+        household = normalize_inputs(inputs)
+        location = self.locate(household, interpolate=interpolate)
+        if location is None:
+            return None
+        cell, weights = location
+        diagnostics_key = (
+            f"{household['state']}/{bool(household['child_ages'])}"
+        )
+
+        entries = {}
+        for reform_name in REFORM_NAMES:
+            values = sum(
+                weight * self.values[reform_name][(*cell, income_index)]
+                for income_index, weight in weights
+            )
+            entries[reform_name] = {
+                "result": {
+                    column: float(value)
+                    for column, value in zip(self.columns, values)
+                    if not np.isnan(value)
+                },
+                "diagnostics": self.diagnostics[reform_name][diagnostics_key],
+            }
+        return entries, len(weights) > 1
+
+
+@functools.lru_cache(maxsize=None)
+def get_household_grid():
+    """Load the precomputed household grid, or None if none was deployed.
+
+    A grid built from other reforms, another model version or another
+    result schema is refused, so stale results are never served.
+    """
+    path = REMOTE_HOUSEHOLD_GRID
+    if not path.exists():
+        path = LOCAL_HOUSEHOLD_GRID
+    if not path.exists():
+        return None
+    grid = HouseholdGrid.load(path)
+    fingerprint = grid.scalars.get("fingerprint")
+    if fingerprint != get_results_fingerprint():
+        print(
+            json.dumps(
+                {
+                    "event": "household_grid_stale",
+                    "path": str(path),
+                    "fingerprint": fingerprint,
+                    "expected": get_results_fingerprint(),
+                }
+            )
         )
-    except FileNotFoundError:
-        federal_credits = []
+        return None
+    return grid
 
-    try:
-        state_credits = load_credits_from_yaml(package, resource_path_state)
-    except FileNotFoundError:
-        state_credits = []
 
-    federal_credits_dict = calculate_values(
-        federal_credits, simulation, YEAR
+def simulate_reform(reform_name, inputs):
+    """Run a single reform scenario for one household.
+
+    Returns the result dict, its credit diagnostics and its stage timings.
+    """
+    timings = StageTimings()
+    results, diagnostics = simulate_households(
+        reform_name, [inputs], timings
     )
-    state_credits_dict = calculate_values(state_credits, simulation, YEAR)
+    return {
+        "result": results[0],
+        "diagnostics": diagnostics[0],
+        "timings": timings.seconds,
+    }
+
 
+def build_response(entries):
+    """Split {reform: {"result", "diagnostics"}} entries into a response."""
     return {
-        "Household Net Income": household_net_income,
-        "Income Tax Before Credits": household_tax_before_refundable_credits,
-        "Refundable Tax Credits": household_refundable_tax_credits,
-        **federal_credits_dict,
-        **state_credits_dict,
+        "results": {
+            reform_name: entry["result"]
+            for reform_name, entry in entries.items()
+        },
+        "diagnostics": {
+            reform_name: entry["diagnostics"]
+            for reform_name, entry in entries.items()
+        },
     }
 
 
+@app.cls(image=image, enable_memory_snapshot=True, timeout=300)
+class HouseholdSimulator:
+    """Containers that simulate single households, warmed before snapshot."""
+
+    @modal.enter(snap=True)
+    def warm(self):
+        warm_container()
+
+    @modal.method()
+    def simulate_reform(self, reform_name, inputs):
+        """Run a single reform scenario in its own container."""
+        return simulate_reform(reform_name, inputs)
+
+    @modal.method()
+    def simulate_reform_curve(
+        self, reform_name, inputs, income_min, income_max, count
+    ):
+        """Run a single reform's net income curve in its own container."""
+        return simulate_curve(
+            reform_name, inputs, income_min, income_max, count
+        )
+
+    # The label keeps the URL the frontend calls
+    @modal.web_endpoint(method="POST", label="election-dashboard-calculate")
+    def calculate(self, data: dict):
+        return handle_calculate(data)
+
+    @modal.exit()
+    def publish_metrics(self):
+        publish_stage_histograms(wait=True)
+
+
+@app.cls(image=image, enable_memory_snapshot=True, timeout=3600)
+class BatchSimulator:
+    """Containers that simulate chunks of households for calculate_batch."""
+
+    @modal.enter(snap=True)
+    def warm(self):
+        warm_container()
+
+    @modal.method()
+    def simulate_chunk(self, households):
+        """Run every reform over a chunk of households.
+
+        Maps each reform name to its (results, diagnostics) lists.
+        """
+        return {
+            reform_name: simulate_households(reform_name, households)
+            for reform_name in REFORM_NAMES
+        }
+
+
 @app.function(image=image, timeout=300)
 @modal.web_endpoint(method="POST")
-def calculate(data: dict):
-    from flask import jsonify
+def calculate_curve(data: dict):
+    import numpy as np
 
     inputs = data.get("inputs", {})
-    reforms = ["Baseline", "Harris", "Trump"]
+    income_min = float(data.get("income_min", 0))
+    income_max = float(data.get("income_max", 200_000))
+    count = int(data.get("count", CURVE_POINTS))
+    if not 2 <= count <= MAX_CURVE_POINTS:
+        return {"error": f"count must be between 2 and {MAX_CURVE_POINTS}"}
+    if income_max <= income_min:
+        return {"error": "income_max must be greater than income_min"}
+
+    outputs = HouseholdSimulator().simulate_reform_curve.starmap(
+        [
+            (reform_name, inputs, income_min, income_max, count)
+            for reform_name in REFORM_NAMES
+        ]
+    )
+    entries = dict(zip(REFORM_NAMES, outputs))
+    return {
+        "incomes": np.linspace(income_min, income_max, count).tolist(),
+        **build_response(entries),
+    }
 
-    results = {}
-    for reform_name in reforms:
-        results[reform_name] = run_simulation(reform_name, inputs)
 
-    return {"results": results}
+def handle_calculate(data):
+    """Answer a calculate request from a warmed HouseholdSimulator."""
+    inputs = data.get("inputs", {})
+    mode = data.get("mode", "parallel")
+    if mode not in EXECUTION_MODES:
+        return {"error": f"Unknown execution mode: {mode}"}
+
+    # Common households are answered straight from the precomputed grid
+    grid = get_household_grid()
+    grid_hit = grid and grid.lookup(
+        inputs, interpolate=bool(data.get("interpolate"))
+    )
+    if grid_hit:
+        entries, interpolated = grid_hit
+        response = build_response(entries)
+        if interpolated:
+            response["interpolated"] = True
+        if data.get("debug"):
+            response["source"] = "grid"
+        return response
+
+    cache = get_result_cache()
+    keys = {
+        reform_name: result_cache_key(reform_name, inputs)
+        for reform_name in REFORM_NAMES
+    }
+    entries = {
+        reform_name: cache.get(keys[reform_name])
+        for reform_name in REFORM_NAMES
+    }
+    missing = [
+        reform_name
+        for reform_name in REFORM_NAMES
+        if entries[reform_name] is None
+    ]
+
+    if mode == "parallel" and missing:
+        # Fan the scenarios out so the request only waits for the slowest
+        outputs = HouseholdSimulator().simulate_reform.starmap(
+            [(reform_name, inputs) for reform_name in missing]
+        )
+        computed = dict(zip(missing, outputs))
+    else:
+        computed = {
+            reform_name: simulate_reform(reform_name, inputs)
+            for reform_name in missing
+        }
+
+    # Timings describe this request only, so they are kept out of the cache
+    timings = {}
+    for reform_name, entry in computed.items():
+        timings[reform_name] = entry.pop("timings")
+        record_timings(reform_name, timings[reform_name])
+        cache.set(keys[reform_name], entry)
+        entries[reform_name] = entry
+    if computed:
+        publish_stage_histograms()
+
+    stats = cache.stats()
+    print(f"Result cache: {stats['hits']} hits, {stats['misses']} misses")
+
+    response = build_response(entries)
+    if data.get("debug"):
+        response["cache"] = stats
+        response["timings"] = timings
+    return response
+
+
+def expand_grid(grid):
+    """Expand a grid spec into a list of household inputs.
+
+    The spec has a "base" dict of shared inputs and an "axes" dict mapping
+    input names to lists of values; every combination of axis values is
+    applied on top of the base inputs.
+    """
+    base = grid.get("base", {})
+    axes = grid.get("axes", {})
+    names = list(axes)
+    return [
+        {**base, **dict(zip(names, values))}
+        for values in itertools.product(*(axes[name] for name in names))
+    ]
+
+
+@app.function(image=image, timeout=3600)
+@modal.web_endpoint(method="POST")
+def calculate_batch(data: dict):
+    from fastapi.responses import JSONResponse, StreamingResponse
+
+    if "households" in data:
+        households = data["households"]
+    elif "grid" in data:
+        households = expand_grid(data["grid"])
+    else:
+        return {"error": "Provide either households or grid"}
+
+    # Reject bad households before any of the stream has been sent
+    invalid = {}
+    for index, household in enumerate(households):
+        try:
+            normalize_inputs(household)
+        except (KeyError, TypeError, AttributeError) as error:
+            invalid[index] = f"{type(error).__name__}: {error}"
+    if invalid:
+        return JSONResponse(
+            status_code=422,
+            content={"error": "Invalid households", "invalid": invalid},
+        )
+
+    chunk_size = max(int(data.get("chunk_size", BATCH_CHUNK_SIZE)), 1)
+    chunks = [
+        households[start : start + chunk_size]
+        for start in range(0, len(households), chunk_size)
+    ]
+
+    def stream():
+        index = 0
+        # map keeps chunk order, so rows stream back in input order. A chunk
+        # that fails is reported row by row rather than ending the stream.
+        outputs = BatchSimulator().simulate_chunk.map(
+            chunks, return_exceptions=True
+        )
+        for chunk, chunk_results in zip(chunks, outputs):
+            for offset, household in enumerate(chunk):
+                if isinstance(chunk_results, Exception):
+                    row = {
+                        "index": index,
+                        "inputs": household,
+                        "error": f"{type(chunk_results).__name__}: "
+                        f"{chunk_results}",
+                    }
+                    yield json.dumps(row) + "\n"
+                    index += 1
+                    continue
+                row = {
+                    "index": index,
+                    "inputs": household,
+                    "results": {
+                        reform_name: chunk_results[reform_name][0][offset]
+                        for reform_name in REFORM_NAMES
+                    },
+                    "diagnostics": {
+                        reform_name: chunk_results[reform_name][1][offset]
+                        for reform_name in REFORM_NAMES
+                    },
+                }
+                yield json.dumps(row) + "\n"
+                index += 1
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
 
 
 @app.function(image=image, timeout=60)
 @modal.web_endpoint(method="GET")
 def health():
     return {"status": "ok", "app": "election-dashboard"}
+
+
+@app.function(image=image, timeout=60)
+@modal.web_endpoint(method="GET")
+def metrics():
+    """Stage timing histograms of the requests every container served."""
+    from fastapi.responses import PlainTextResponse
+
+    store = get_metrics_store()
+    compact_metrics_store(store)
+    histograms = StageHistograms()
+    for entry in store.values():
+        histograms.merge(entry["series"])
+    return PlainTextResponse(
+        histograms.render(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+def warm_container():
+    """Build everything simulations share so it is captured in a snapshot.
+
+    The simulator classes call this from their snap=True enter hook, which
+    runs before the memory snapshot is taken. Restored containers skip the
+    policyengine-us import and system construction. Lightweight endpoints
+    never call it.
+    """
+    start = time.perf_counter()
+    for reform_name in REFORM_NAMES:
+        get_tax_benefit_system(reform_name)
+    get_refundable_credit_index()
+    get_policyengine_version()
+    get_household_grid()
+    print(f"Warmed container in {time.perf_counter() - start:.3f}s")
+
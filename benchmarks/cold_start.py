@@ -0,0 +1,77 @@
+"""
+Measure first-request latency with and without a pre-warmed container.
+
+Each scenario runs in a fresh interpreter. "lazy" imports the API module
+and serves a request straight away, as a container without a snapshot
+does. "snapshot" runs warm_container() first, which is the state a
+memory snapshot restores, and then times the same request.
+
+This stands in for a Modal snapshot restore without measuring one: the
+"snapshot" figure leaves out the time Modal takes to restore the
+container's memory, which only a deployed app can show.
+
+Usage: python benchmarks/cold_start.py [--repeats N]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+API_DIR = Path(__file__).resolve().parents[1] / "api"
+
+SCENARIO = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {api_dir!r})
+import modal_app
+import_time = time.perf_counter() - start
+if {warm!r}:
+    modal_app.warm_container()
+start = time.perf_counter()
+for reform_name in modal_app.REFORM_NAMES:
+    modal_app.run_simulation(reform_name, {inputs!r})
+print(json.dumps({{
+    "import": import_time,
+    "request": time.perf_counter() - start,
+}}))
+"""
+
+INPUTS = {
+    "state": "CA",
+    "is_married": True,
+    "child_ages": [4, 9],
+    "income": 60_000,
+    "head_age": 40,
+    "spouse_age": 40,
+}
+
+
+def run_scenario(warm):
+    code = SCENARIO.format(api_dir=str(API_DIR), warm=warm, inputs=INPUTS)
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    for name, warm in [("lazy", False), ("snapshot", True)]:
+        runs = [run_scenario(warm) for _ in range(args.repeats)]
+        first_hit = statistics.median(
+            run["request"] + (0 if warm else run["import"]) for run in runs
+        )
+        print(f"{name:<9} first request: {first_hit:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
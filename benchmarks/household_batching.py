@@ -0,0 +1,85 @@
+"""
+Compare the one-simulation-per-household path with the batched engine.
+
+Usage: python benchmarks/household_batching.py [--households N]
+"""
+
+import argparse
+import itertools
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "api"))
+
+from modal_app import (  # noqa: E402
+    REFORM_NAMES,
+    get_tax_benefit_system,
+    run_simulation,
+    simulate_households,
+)
+
+STATES = ["CA", "NY", "TX", "FL", "IL", "PA", "OH", "GA", "NC", "MI"]
+INCOMES = [10_000, 30_000, 60_000, 100_000, 250_000]
+CHILD_AGES = [[], [4], [4, 9]]
+
+
+def sample_households(count):
+    grid = itertools.cycle(
+        itertools.product(STATES, INCOMES, CHILD_AGES, [False, True])
+    )
+    households = []
+    for state, income, child_ages, is_married in itertools.islice(
+        grid, count
+    ):
+        households.append(
+            {
+                "state": state,
+                "is_married": is_married,
+                "child_ages": child_ages,
+                "income": income,
+                "head_age": 40,
+                "spouse_age": 40 if is_married else None,
+                "tip_income": 2_000,
+                "overtime_income": 3_000,
+            }
+        )
+    return households
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--households", type=int, default=50)
+    args = parser.parse_args()
+
+    households = sample_households(args.households)
+
+    # Compile the reforms first so both paths are timed warm
+    for reform_name in REFORM_NAMES:
+        get_tax_benefit_system(reform_name)
+
+    start = time.perf_counter()
+    for household in households:
+        for reform_name in REFORM_NAMES:
+            run_simulation(reform_name, household)
+    serial_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for reform_name in REFORM_NAMES:
+        simulate_households(reform_name, households)
+    batched_time = time.perf_counter() - start
+
+    print(f"Households:           {len(households)}")
+    print(
+        f"One simulation each:  {serial_time:.2f}s "
+        f"({serial_time / len(households) * 1000:.1f}ms per household)"
+    )
+    print(
+        f"Batched per reform:   {batched_time:.2f}s "
+        f"({batched_time / len(households) * 1000:.1f}ms per household)"
+    )
+    print(f"Speed-up:             {serial_time / batched_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Time the household API and microsimulation paths against stored baselines.
+
+Benchmarks:
+  household_cold      first request in a fresh interpreter, with imports
+  household_warm      requests for households across states, once warm
+  reform_compile      compiling the reforms and building their systems
+  microsim_aggregate  metrics and impacts for a synthetic dataset
+  microsim_chunked    the same metrics folded from chunked partial sums
+  microsim_intervals  bootstrap intervals for the synthetic dataset
+
+Everything runs locally; nothing is sent to Modal. Each benchmark runs
+--repeats times and its median is compared with the median stored in the
+baseline file. The run fails if any benchmark is more than --threshold
+slower than its baseline. --save records the current medians as the new
+baseline.
+
+Usage: python benchmarks/suite.py [--only NAME ...] [--repeats N] [--save]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "api"))
+
+from cold_start import run_scenario  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines.json"
+
+WARM_HOUSEHOLDS = 20
+SYNTHETIC_HOUSEHOLDS = 50_000
+SYNTHETIC_STATES = ["CA", "NY", "TX", "FL", "IL", "PA", "OH", "WY", "VT"]
+SYNTHETIC_REFORMS = {"Baseline": 0, "Harris": 800, "Trump": 500}
+CHUNK_HOUSEHOLDS = 10_000
+
+
+def household_cold():
+    def run():
+        run_scenario(warm=False)
+
+    return run
+
+
+def household_warm():
+    from household_batching import sample_households
+    from modal_app import REFORM_NAMES, run_simulation, warm_container
+
+    warm_container()
+    households = sample_households(WARM_HOUSEHOLDS)
+
+    def run():
+        for household in households:
+            for reform_name in REFORM_NAMES:
+                run_simulation(reform_name, household)
+
+    return run
+
+
+def reform_compile():
+    from modal_app import REFORM_NAMES, get_reform, get_tax_benefit_system
+
+    def run():
+        get_reform.cache_clear()
+        get_tax_benefit_system.cache_clear()
+        for reform_name in REFORM_NAMES:
+            get_tax_benefit_system(reform_name)
+
+    return run
+
+
+def synthetic_arrays(households=SYNTHETIC_HOUSEHOLDS, seed=0):
+    """Arrays shaped like simulate_arrays' output, for each synthetic reform.
+
+    Reforms share households and weights and differ only in net income.
+    """
+    rng = np.random.default_rng(seed)
+    states = rng.choice(SYNTHETIC_STATES, households)
+    people = rng.integers(1, 6, households)
+    household_of_person = np.repeat(np.arange(households), people)
+    weights = rng.uniform(100, 2_000, households)
+    net_income = rng.lognormal(11, 0.8, households)
+
+    arrays_by_reform = {}
+    for reform_name, transfer in SYNTHETIC_REFORMS.items():
+        reform_net_income = net_income + transfer
+        arrays_by_reform[reform_name] = {
+            "household.household_id": np.arange(households),
+            "household.household_weight": weights,
+            "household.state_code": states,
+            "household.household_net_income": reform_net_income,
+            "household.equiv_household_net_income": reform_net_income
+            / np.sqrt(people),
+            "household.household_count_people": people.astype(float),
+            "household.poverty_gap": np.maximum(
+                25_000 - reform_net_income, 0
+            ),
+            "person.household_id": household_of_person,
+            "person.person_weight": weights[household_of_person],
+            "person.state_code": states[household_of_person],
+            "person.in_poverty": reform_net_income[household_of_person]
+            < 15_000 + 5_000 * people[household_of_person],
+            "person.is_child": rng.random(len(household_of_person)) < 0.25,
+        }
+    return arrays_by_reform
+
+
+def microsim_aggregate():
+    from nationwide_impacts.calculator.metrics import (
+        aggregate_metrics,
+        calculate_impacts,
+    )
+
+    arrays_by_reform = synthetic_arrays()
+
+    def run():
+        calculate_impacts(aggregate_metrics(arrays_by_reform))
+
+    return run
+
+
+def microsim_chunked():
+    from nationwide_impacts.calculator.metrics import (
+        add_partial_sums,
+        calculate_impacts,
+        metrics_from_sums,
+        partial_sums,
+    )
+
+    arrays_by_reform = synthetic_arrays()
+    chunks = {}
+    for reform_name, arrays in arrays_by_reform.items():
+        household_of_person = arrays["person.household_id"]
+        chunks[reform_name] = []
+        for start in range(0, SYNTHETIC_HOUSEHOLDS, CHUNK_HOUSEHOLDS):
+            stop = start + CHUNK_HOUSEHOLDS
+            people = (household_of_person >= start) & (
+                household_of_person < stop
+            )
+            chunks[reform_name].append(
+                {
+                    key: (
+                        values[start:stop]
+                        if key.startswith("household.")
+                        else values[people]
+                    )
+                    for key, values in arrays.items()
+                }
+            )
+
+    def run():
+        sums_by_reform = {}
+        for reform_name, reform_chunks in chunks.items():
+            totals = None
+            for chunk in reform_chunks:
+                totals = add_partial_sums(totals, partial_sums(chunk))
+            sums_by_reform[reform_name] = totals
+        calculate_impacts(metrics_from_sums(sums_by_reform))
+
+    return run
+
+
+def microsim_intervals():
+    from nationwide_impacts.calculator.metrics import impact_intervals
+
+    arrays_by_reform = synthetic_arrays()
+
+    def run():
+        impact_intervals(arrays_by_reform)
+
+    return run
+
+
+BENCHMARKS = {
+    "household_cold": household_cold,
+    "household_warm": household_warm,
+    "reform_compile": reform_compile,
+    "microsim_aggregate": microsim_aggregate,
+    "microsim_chunked": microsim_chunked,
+    "microsim_intervals": microsim_intervals,
+}
+
+# Benchmarks whose first run is the measurement, so they get no warm-up run
+COLD_BENCHMARKS = {"household_cold"}
+
+
+def time_benchmark(name, repeats):
+    """Median seconds per run of a benchmark over repeats runs."""
+    run = BENCHMARKS[name]()
+    if name not in COLD_BENCHMARKS:
+        run()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS)
+    )
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Fail when a median is this fraction slower than its baseline.",
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument(
+        "--save",
+        action="store_true",
+        help="Record these medians as the baseline instead of comparing.",
+    )
+    args = parser.parse_args()
+
+    baselines = {}
+    if args.baseline.exists():
+        baselines = json.loads(args.baseline.read_text())
+
+    medians = {}
+    regressions = []
+    for name in args.only:
+        medians[name] = time_benchmark(name, args.repeats)
+        line = f"{name:<20} {medians[name] * 1000:10.1f}ms"
+        if name in baselines:
+            change = medians[name] / baselines[name] - 1
+            line += (
+                f"  (baseline {baselines[name] * 1000:.1f}ms, "
+                f"{change:+.0%})"
+            )
+            if change > args.threshold:
+                regressions.append(name)
+                line += "  REGRESSION"
+        print(line)
+
+    if args.save:
+        args.baseline.write_text(
+            json.dumps({**baselines, **medians}, indent=2, sort_keys=True)
+            + "\n"
+        )
+        print(f"Saved baselines to {args.baseline}")
+    elif regressions:
+        print(
+            f"{len(regressions)} benchmark(s) more than "
+            f"{args.threshold:.0%} slower than baseline: "
+            f"{', '.join(regressions)}"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,12 +24,18 @@ export interface ReformResults {
   [creditName: string]: number;
 }
 
+export interface CreditDiagnostics {
+  skipped: Record<string, string>;
+  failed: Record<string, string>;
+}
+
 export interface CalculationResponse {
   results: {
     Baseline: ReformResults;
     Harris: ReformResults;
     Trump: ReformResults;
   };
+  diagnostics?: Record<ReformName, CreditDiagnostics>;
 }
 
 export type ReformName = "Baseline" | "Harris" | "Trump";
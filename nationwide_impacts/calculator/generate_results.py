@@ -1,16 +1,95 @@
+import argparse
 import os
-from nationwide_impacts.calculator.microsim import calculate_all_reform_impacts
+from nationwide_impacts.calculator.microsim import (
+    DEFAULT_WORKERS,
+    calculate_all_reform_impacts,
+    calculate_multi_year_impacts,
+    calculate_stacked_impacts,
+)
 
 
-def generate_results():
+def generate_results(
+    max_workers=DEFAULT_WORKERS,
+    max_memory_gb=None,
+    force=False,
+    stacked=False,
+    chunk_size=None,
+    years=None,
+):
     # Create data directory if it doesn't exist
     if not os.path.exists("data"):
         os.makedirs("data")
 
     # Calculate all reform impacts
-    results_df = calculate_all_reform_impacts()
+    results_df = calculate_all_reform_impacts(
+        max_workers=max_workers,
+        max_memory_gb=max_memory_gb,
+        force=force,
+        chunk_size=chunk_size,
+    )
+    if stacked:
+        calculate_stacked_impacts(
+            max_workers=max_workers,
+            max_memory_gb=max_memory_gb,
+            chunk_size=chunk_size,
+        )
+    if years:
+        first_year, last_year = years
+        calculate_multi_year_impacts(
+            range(first_year, last_year + 1),
+            max_workers=max_workers,
+            max_memory_gb=max_memory_gb,
+        )
     print("Calculations complete!")
 
 
 if __name__ == "__main__":
-    generate_results()
+    parser = argparse.ArgumentParser(description="Regenerate impact CSVs.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Number of microsimulations to run at once.",
+    )
+    parser.add_argument(
+        "--max-memory-gb",
+        type=float,
+        default=None,
+        help="Address-space ceiling for each worker process.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Recompute every reform, even if its fingerprint is unchanged.",
+    )
+    parser.add_argument(
+        "--stacked",
+        action="store_true",
+        help="Also calculate individual, marginal and combined package impacts.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help=(
+            "Read and simulate this many households at a time to cap peak "
+            "memory. Intervals are skipped and Gini is approximated."
+        ),
+    )
+    parser.add_argument(
+        "--years",
+        type=int,
+        nargs=2,
+        metavar=("FIRST", "LAST"),
+        default=None,
+        help="Also calculate nationwide impacts for each year in this range.",
+    )
+    args = parser.parse_args()
+    generate_results(
+        max_workers=args.workers,
+        max_memory_gb=args.max_memory_gb,
+        force=args.force,
+        stacked=args.stacked,
+        chunk_size=args.chunk_size,
+        years=args.years,
+    )
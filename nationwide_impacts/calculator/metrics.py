@@ -0,0 +1,541 @@
+import numpy as np
+import pandas as pd
+
+# State label used for nationwide aggregates
+NATIONWIDE = "US"
+
+# Impact columns written to the results CSVs, after reform_type (and state)
+IMPACT_COLUMNS = [
+    "cost",
+    "poverty_pct_cut",
+    "child_poverty_pct_cut",
+    "poverty_gap_pct_cut",
+    "gini_index_pct_cut",
+]
+
+# Bootstrap replicates and confidence level of the state impact intervals
+BOOTSTRAP_REPLICATES = 100
+CONFIDENCE_LEVEL = 0.9
+
+# Replicates whose (replicates, rows) weight matrices are held at once
+REPLICATE_BLOCK_SIZE = 10
+
+# Interval columns written after IMPACT_COLUMNS in the state results CSV
+INTERVAL_COLUMNS = [
+    f"{column}_{bound}"
+    for column in IMPACT_COLUMNS
+    for bound in ("ci_low", "ci_high")
+]
+
+# Equivalised income bin edges for the Gini histograms of chunked runs: $250
+# bins up to $500k, then log-spaced bins up to $1bn
+GINI_BIN_EDGES = np.concatenate(
+    [np.arange(-100_000, 500_000, 250), np.geomspace(500_000, 1e9, 400)]
+)
+
+
+def weighted_gini(values, weights, groups, n_groups):
+    """Weighted Gini index of values within each group, in one sorted pass.
+
+    Rows are sorted by (group, value) and each group's Lorenz curve is
+    built from cumulative sums offset by the preceding groups' totals.
+    """
+    order = np.lexsort((values, groups))
+    groups = groups[order]
+    weights = weights[order]
+    income = values[order] * weights
+
+    total_weight = np.bincount(groups, weights=weights, minlength=n_groups)
+    total_income = np.bincount(groups, weights=income, minlength=n_groups)
+
+    preceding_income = np.concatenate([[0], np.cumsum(total_income)[:-1]])
+    cumulative_income = np.cumsum(income) - preceding_income[groups]
+    lorenz_area = np.bincount(
+        groups,
+        weights=weights * (2 * cumulative_income - income),
+        minlength=n_groups,
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 1 - lorenz_area / (total_weight * total_income)
+
+
+class GroupedArrays:
+    """Arrays of several reforms stacked and grouped by (reform, state)."""
+
+    def __init__(self, arrays_by_reform, by_state=True):
+        self.reform_arrays = list(arrays_by_reform.values())
+        self.by_state = by_state
+        if by_state:
+            self.states = np.unique(self.reform_arrays[0]["household.state_code"])
+        else:
+            self.states = np.array([NATIONWIDE])
+        self.n_groups = len(arrays_by_reform) * len(self.states)
+        self._groups = {}
+
+    def stack(self, key):
+        return np.concatenate([arrays[key] for arrays in self.reform_arrays])
+
+    def groups(self, entity):
+        if entity not in self._groups:
+            parts = []
+            for i, arrays in enumerate(self.reform_arrays):
+                codes = arrays[f"{entity}.state_code"]
+                if self.by_state:
+                    state_index = np.searchsorted(self.states, codes)
+                else:
+                    state_index = np.zeros(len(codes), dtype=int)
+                parts.append(i * len(self.states) + state_index)
+            self._groups[entity] = np.concatenate(parts)
+        return self._groups[entity]
+
+    def weights(self, entity):
+        return self.stack(f"{entity}.{entity}_weight")
+
+    def group_sum(self, entity, values):
+        return np.bincount(
+            self.groups(entity), weights=values, minlength=self.n_groups
+        )
+
+    def total(self, entity, values=1.0):
+        """Weighted total of values (by default, of units) in each group."""
+        return self.group_sum(entity, values * self.weights(entity))
+
+    def gini(self, values, weights):
+        return weighted_gini(
+            values, weights, self.groups("household"), self.n_groups
+        )
+
+
+class ReplicateArrays(GroupedArrays):
+    """One reform's arrays under bootstrap replicate household weights.
+
+    multipliers is a (replicates, households) matrix scaling each
+    household's weight, and its people's; resample swaps in another block
+    of replicates and keeps everything else. Weights become (replicates,
+    rows) matrices. Each entity's rows are kept sorted by group, so every
+    group sum is one np.add.reduceat over all replicates and metrics come
+    back as (replicates, states).
+    """
+
+    def __init__(self, arrays, multipliers, by_state=True):
+        super().__init__({"Reform": arrays}, by_state)
+        self._order = {}
+        self._sorted_groups = {}
+        self._starts = {}
+        self._households = {}
+        self.resample(multipliers)
+
+    def resample(self, multipliers):
+        self.multipliers = multipliers
+        self._weights = {}
+
+    def _sort_order(self, entity):
+        if entity not in self._order:
+            self._order[entity] = np.argsort(
+                super().groups(entity), kind="stable"
+            )
+        return self._order[entity]
+
+    def stack(self, key):
+        return super().stack(key)[self._sort_order(key.split(".")[0])]
+
+    def groups(self, entity):
+        if entity not in self._sorted_groups:
+            self._sorted_groups[entity] = super().groups(entity)[
+                self._sort_order(entity)
+            ]
+        return self._sorted_groups[entity]
+
+    def weights(self, entity):
+        if entity not in self._weights:
+            if entity not in self._households:
+                if entity == "person":
+                    # Each person takes their household's multiplier
+                    household_ids = super().stack("household.household_id")
+                    order = np.argsort(household_ids)
+                    self._households[entity] = order[
+                        np.searchsorted(
+                            household_ids[order], self.stack("person.household_id")
+                        )
+                    ]
+                else:
+                    self._households[entity] = self._sort_order(entity)
+            # np.take keeps rows contiguous, which reduceat needs to be fast
+            multipliers = np.take(self.multipliers, self._households[entity], axis=1)
+            self._weights[entity] = multipliers * super().weights(entity)
+        return self._weights[entity]
+
+    def group_sum(self, entity, values):
+        groups = self.groups(entity)
+        if entity not in self._starts:
+            self._starts[entity] = np.flatnonzero(
+                np.concatenate([[True], groups[1:] != groups[:-1]])
+            )
+        starts = self._starts[entity]
+        sums = np.zeros((len(values), self.n_groups))
+        sums[:, groups[starts]] = np.add.reduceat(values, starts, axis=1)
+        return sums
+
+    def gini(self, values, weights):
+        """weighted_gini for each replicate's row of weights at once.
+
+        Rows are already sorted by group, so sorting by value within each
+        group keeps the group sums' row order.
+        """
+        order = np.lexsort((values, self.groups("household")))
+        groups = self.groups("household")[order]
+        weights = np.take(weights, order, axis=1)
+        income = values[order] * weights
+
+        total_weight = self.group_sum("household", weights)
+        total_income = self.group_sum("household", income)
+        preceding_income = np.cumsum(total_income, axis=1) - total_income
+        cumulative_income = np.cumsum(income, axis=1) - preceding_income[:, groups]
+        lorenz_area = self.group_sum(
+            "household", weights * (2 * cumulative_income - income)
+        )
+        return 1 - lorenz_area / (total_weight * total_income)
+
+
+def _net_income(data):
+    return data.total(
+        "household", data.stack("household.household_net_income")
+    ) / data.total("household")
+
+
+def _total_net_income(data):
+    return data.total("household", data.stack("household.household_net_income"))
+
+
+def _poverty(data):
+    in_poverty = data.stack("person.in_poverty").astype(float)
+    return data.total("person", in_poverty) / data.total("person")
+
+
+def _child_poverty(data):
+    in_poverty = data.stack("person.in_poverty").astype(float)
+    is_child = data.stack("person.is_child").astype(float)
+    return data.total("person", in_poverty * is_child) / data.total(
+        "person", is_child
+    )
+
+
+def _poverty_gap(data):
+    return data.total("household", data.stack("household.poverty_gap"))
+
+
+def _gini(data):
+    return data.gini(
+        data.stack("household.equiv_household_net_income"),
+        data.weights("household")
+        * data.stack("household.household_count_people"),
+    )
+
+
+# Each metric's variables, keyed "<entity>.<variable>", and its function of
+# GroupedArrays. Every entity a metric reads also needs its weight and
+# state_code.
+METRICS = {
+    "net_income": (["household.household_net_income"], _net_income),
+    "total_net_income": (["household.household_net_income"], _total_net_income),
+    "poverty": (["person.in_poverty"], _poverty),
+    "child_poverty": (["person.in_poverty", "person.is_child"], _child_poverty),
+    "poverty_gap": (["household.poverty_gap"], _poverty_gap),
+    "gini": (
+        [
+            "household.equiv_household_net_income",
+            "household.household_count_people",
+        ],
+        _gini,
+    ),
+}
+
+
+def metric_variables(metric_names=METRICS, replicates=False):
+    """The union of the variables the named metrics need, by entity.
+
+    With replicates, household ids are added so people can be matched to
+    their household's replicate weights.
+    """
+    variables = {}
+    if replicates:
+        variables = {
+            entity: [f"{entity}_weight", "state_code", "household_id"]
+            for entity in ["household", "person"]
+        }
+    for metric_name in metric_names:
+        for key in METRICS[metric_name][0]:
+            entity, variable = key.split(".")
+            entity_variables = variables.setdefault(
+                entity, [f"{entity}_weight", "state_code"]
+            )
+            if variable not in entity_variables:
+                entity_variables.append(variable)
+    return variables
+
+
+def aggregate_metrics(arrays_by_reform, by_state=True, metric_names=METRICS):
+    """Compute the named metrics for every reform in a single vectorized pass.
+
+    arrays_by_reform maps reform names to arrays of metric_variables, as
+    returned by simulate_arrays, for the same dataset. Rows of all reforms
+    are stacked and grouped by (reform, state) so each metric is one
+    np.bincount. Returns a DataFrame indexed by (reform_type, state) with a
+    column per metric; by default net_income (weighted mean),
+    total_net_income, poverty, child_poverty, poverty_gap and gini. The
+    state is NATIONWIDE unless by_state is set.
+    """
+    data = GroupedArrays(arrays_by_reform, by_state)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return pd.DataFrame(
+            {
+                metric_name: METRICS[metric_name][1](data)
+                for metric_name in metric_names
+            },
+            index=pd.MultiIndex.from_product(
+                [list(arrays_by_reform), data.states],
+                names=["reform_type", "state"],
+            ),
+        )
+
+
+def replicate_metrics(
+    arrays_by_reform, n_replicates=BOOTSTRAP_REPLICATES, seed=0, by_state=True
+):
+    """Compute every metric for every reform under bootstrap replicates.
+
+    Each replicate scales every household's weight by an independent
+    Poisson(1) draw (a Poisson bootstrap). The draws are shared across
+    reforms, so replicate impacts compare the same resampled households.
+    Replicates are drawn and computed REPLICATE_BLOCK_SIZE at a time to
+    bound memory. arrays_by_reform needs metric_variables(replicates=True).
+    Returns a DataFrame like aggregate_metrics' with a third "replicate"
+    index level.
+    """
+    first_arrays = next(iter(arrays_by_reform.values()))
+    households = len(first_arrays["household.household_weight"])
+    rng = np.random.default_rng(seed)
+    blocks = [
+        rng.poisson(1.0, (min(REPLICATE_BLOCK_SIZE, n_replicates - start), households))
+        for start in range(0, n_replicates, REPLICATE_BLOCK_SIZE)
+    ]
+
+    frames = []
+    for reform_name, arrays in arrays_by_reform.items():
+        results = {metric_name: [] for metric_name in METRICS}
+        data = ReplicateArrays(arrays, blocks[0], by_state)
+        for multipliers in blocks:
+            data.resample(multipliers)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                for metric_name, (_, function) in METRICS.items():
+                    results[metric_name].append(function(data))
+        # (replicates, states) results are laid out state by state
+        columns = {
+            metric_name: np.concatenate(values).T.ravel()
+            for metric_name, values in results.items()
+        }
+        index = pd.MultiIndex.from_product(
+            [[reform_name], data.states, range(n_replicates)],
+            names=["reform_type", "state", "replicate"],
+        )
+        frames.append(pd.DataFrame(columns, index=index))
+    return pd.concat(frames)
+
+
+def impact_intervals(
+    arrays_by_reform,
+    n_replicates=BOOTSTRAP_REPLICATES,
+    level=CONFIDENCE_LEVEL,
+    seed=0,
+):
+    """Bootstrap percentile intervals of each reform's state impacts.
+
+    Returns one row per (state, reform_type) with INTERVAL_COLUMNS.
+    """
+    impacts = calculate_impacts(
+        replicate_metrics(arrays_by_reform, n_replicates, seed)
+    )
+    tail = (1 - level) / 2
+    bounds = impacts.groupby(["state", "reform_type"], sort=False)[
+        IMPACT_COLUMNS
+    ].quantile([tail, 1 - tail])
+    bounds.index = bounds.index.set_levels(["ci_low", "ci_high"], level=2)
+    intervals = bounds.unstack()
+    intervals.columns = [f"{column}_{bound}" for column, bound in intervals.columns]
+    return intervals[INTERVAL_COLUMNS].reset_index()
+
+
+def _state_groups(codes, by_state):
+    if by_state:
+        return np.unique(codes, return_inverse=True)
+    return np.array([NATIONWIDE]), np.zeros(len(codes), dtype=int)
+
+
+def partial_sums(arrays, by_state=True):
+    """Weighted sums behind every metric for one chunk of a dataset.
+
+    arrays are the arrays returned by simulate_arrays for the chunk. The
+    sums are additive across chunks; the Gini inputs are kept as weighted
+    histograms over GINI_BIN_EDGES. Returns a dict mapping each state (or
+    NATIONWIDE unless by_state is set) to a dict of sums.
+    """
+    n_bins = len(GINI_BIN_EDGES) + 1
+    sums = {}
+
+    states, group = _state_groups(arrays["household.state_code"], by_state)
+    weight = arrays["household.household_weight"]
+    gini_weight = weight * arrays["household.household_count_people"]
+    income_bin = group * n_bins + np.digitize(
+        arrays["household.equiv_household_net_income"], GINI_BIN_EDGES
+    )
+    household_sums = {
+        "households": np.bincount(group, weights=weight),
+        "total_net_income": np.bincount(
+            group, weights=weight * arrays["household.household_net_income"]
+        ),
+        "poverty_gap": np.bincount(
+            group, weights=weight * arrays["household.poverty_gap"]
+        ),
+        "gini_weight": np.bincount(
+            income_bin, weights=gini_weight, minlength=len(states) * n_bins
+        ).reshape(len(states), n_bins),
+        "gini_income": np.bincount(
+            income_bin,
+            weights=gini_weight * arrays["household.equiv_household_net_income"],
+            minlength=len(states) * n_bins,
+        ).reshape(len(states), n_bins),
+    }
+
+    states_of_people, group = _state_groups(
+        arrays["person.state_code"], by_state
+    )
+    weight = arrays["person.person_weight"]
+    in_poverty = arrays["person.in_poverty"].astype(float)
+    is_child = arrays["person.is_child"].astype(float)
+    person_sums = {
+        "people": np.bincount(group, weights=weight),
+        "in_poverty": np.bincount(group, weights=weight * in_poverty),
+        "children": np.bincount(group, weights=weight * is_child),
+        "children_in_poverty": np.bincount(
+            group, weights=weight * in_poverty * is_child
+        ),
+    }
+
+    for group_states, group_sums in [
+        (states, household_sums),
+        (states_of_people, person_sums),
+    ]:
+        for i, state in enumerate(group_states):
+            state_sums = sums.setdefault(state, {})
+            for name, values in group_sums.items():
+                state_sums[name] = values[i]
+    return sums
+
+
+def add_partial_sums(totals, sums):
+    """Fold one chunk's partial_sums into running totals (None to start)."""
+    if totals is None:
+        totals = {}
+    for state, state_sums in sums.items():
+        state_totals = totals.setdefault(state, {})
+        for name, values in state_sums.items():
+            state_totals[name] = state_totals.get(name, 0) + values
+    return totals
+
+
+def metrics_from_sums(sums_by_reform):
+    """Compute aggregate_metrics' columns from each reform's summed chunks.
+
+    sums_by_reform maps reform names to totals built with add_partial_sums.
+    Each reform's Gini is computed from its income histogram, treating
+    everyone in a bin as having the bin's mean income.
+    """
+    reform_names = list(sums_by_reform)
+    states = sorted(next(iter(sums_by_reform.values())))
+    totals = [
+        sums_by_reform[reform_name][state]
+        for reform_name in reform_names
+        for state in states
+    ]
+
+    def column(name):
+        return np.array([state_totals[name] for state_totals in totals])
+
+    gini_weight = column("gini_weight")
+    gini_income = column("gini_income")
+    groups = np.broadcast_to(
+        np.arange(len(totals))[:, None], gini_weight.shape
+    )
+    filled = gini_weight > 0
+    gini = weighted_gini(
+        gini_income[filled] / gini_weight[filled],
+        gini_weight[filled],
+        groups[filled],
+        len(totals),
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return pd.DataFrame(
+            {
+                "net_income": column("total_net_income") / column("households"),
+                "total_net_income": column("total_net_income"),
+                "poverty": column("in_poverty") / column("people"),
+                "child_poverty": column("children_in_poverty")
+                / column("children"),
+                "poverty_gap": column("poverty_gap"),
+                "gini": gini,
+            },
+            index=pd.MultiIndex.from_product(
+                [reform_names, states], names=["reform_type", "state"]
+            ),
+        )
+
+
+def _pct_cut(reform, baseline):
+    return -(reform - baseline) / baseline * 100
+
+
+def calculate_impacts(metrics, nationwide=False, baseline="Baseline"):
+    """Compare each reform's metrics with the baseline rows.
+
+    Nationwide cost is the change in total net income; state cost is the
+    baseline's mean household net income minus the reform's. Any reform
+    in metrics can serve as the baseline. Returns one row per other reform
+    (and state, and any further index level, unless nationwide) with
+    IMPACT_COLUMNS.
+    """
+    reform_metrics = metrics.drop(index=baseline, level="reform_type")
+    baseline_metrics = (
+        metrics.xs(baseline, level="reform_type")
+        .reindex(reform_metrics.index.droplevel("reform_type"))
+        .set_axis(reform_metrics.index)
+    )
+
+    if nationwide:
+        cost = reform_metrics["total_net_income"] - baseline_metrics["total_net_income"]
+    else:
+        cost = baseline_metrics["net_income"] - reform_metrics["net_income"]
+
+    impacts = pd.DataFrame(
+        {
+            "cost": cost,
+            "poverty_pct_cut": _pct_cut(
+                reform_metrics["poverty"], baseline_metrics["poverty"]
+            ),
+            "child_poverty_pct_cut": _pct_cut(
+                reform_metrics["child_poverty"], baseline_metrics["child_poverty"]
+            ),
+            "poverty_gap_pct_cut": _pct_cut(
+                reform_metrics["poverty_gap"], baseline_metrics["poverty_gap"]
+            ),
+            "gini_index_pct_cut": _pct_cut(
+                reform_metrics["gini"], baseline_metrics["gini"]
+            ),
+        }
+    ).reset_index()
+
+    if nationwide:
+        return impacts[["reform_type", *IMPACT_COLUMNS]]
+    # Levels after the state, such as bootstrap replicates, follow reform_type
+    other_levels = reform_metrics.index.names[2:]
+    return impacts[["state", "reform_type", *other_levels, *IMPACT_COLUMNS]]
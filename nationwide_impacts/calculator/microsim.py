@@ -1,140 +1,660 @@
 from policyengine_us import Microsimulation
 import pandas as pd
 import numpy as np
-from nationwide_impacts.calculator.reforms import REFORMS
+from nationwide_impacts.calculator.reforms import REFORMS, REFORM_STACKS
+from nationwide_impacts.data import write_columnar
+from nationwide_impacts.calculator.metrics import (
+    BOOTSTRAP_REPLICATES,
+    CONFIDENCE_LEVEL,
+    IMPACT_COLUMNS,
+    add_partial_sums,
+    aggregate_metrics,
+    calculate_impacts,
+    impact_intervals,
+    metric_variables,
+    metrics_from_sums,
+    partial_sums,
+)
 from policyengine_core.reforms import Reform
+from concurrent.futures import ProcessPoolExecutor
+from importlib.metadata import version
+import hashlib
+import json
 import os
 
+DEFAULT_WORKERS = 4
 
-def calculate_nationwide_enhanced(reform_params=None, year=2025):
-    """Calculate nationwide impact using enhanced CPS dataset."""
+NATIONWIDE_DATASET = "enhanced_cps_2024"
+STATE_DATASET = "pooled_3_year_cps_2023"
+
+# Baseline arrays are stored here, keyed by dataset, year and model version
+BASELINE_STORE = os.path.join("data", "baseline_cache")
+
+NATIONWIDE_RESULTS_PATH = "data/nationwide_impacts_2025.csv"
+STATE_RESULTS_PATH = "data/reform_impacts_2025.csv"
+STACKED_RESULTS_PATH = "data/stacked_impacts_2025.csv"
+MULTI_YEAR_RESULTS_PATHS = {
+    NATIONWIDE_DATASET: "data/nationwide_impacts_multi_year.csv",
+    STATE_DATASET: "data/reform_impacts_multi_year.csv",
+}
+
+# Fingerprints of the reforms behind each dataset's rows in the results CSVs
+MANIFEST_PATH = os.path.join("data", "impacts_manifest.json")
+
+# Variables the impact metrics and their bootstrap intervals read, by the
+# entity they are mapped to
+SIMULATED_VARIABLES = metric_variables(replicates=True)
+
+SIMULATED_KEYS = {
+    f"{entity}.{variable}"
+    for entity, variables in SIMULATED_VARIABLES.items()
+    for variable in variables
+}
+
+
+def compile_reform(reform_params):
     if reform_params is None:
-        sim = Microsimulation(dataset="enhanced_cps_2024")
-    else:
-        reform = Reform.from_dict(reform_params, country_id="us")
-        sim = Microsimulation(reform=reform, dataset="enhanced_cps_2024")
+        return None
+    return Reform.from_dict(reform_params, country_id="us")
+
+
+def simulate_arrays(reform_params, dataset, year, variables=SIMULATED_VARIABLES):
+    """Run a microsimulation and return the arrays the impact metrics need.
+
+    Arrays are keyed "<entity>.<variable>", e.g. "person.in_poverty".
+    """
+    reform = compile_reform(reform_params)
+    sim = Microsimulation(reform=reform, dataset=dataset)
+    return calculate_arrays(sim, year, variables)
+
+
+def simulate_years(reform_params, dataset, years, variables=SIMULATED_VARIABLES):
+    """Run one microsimulation and return its arrays for each of years.
+
+    The dataset is loaded and the simulation built once; each year is then
+    calculated from it, with inputs uprated by the model. Returns a dict
+    mapping each year to its arrays.
+    """
+    reform = compile_reform(reform_params)
+    sim = Microsimulation(reform=reform, dataset=dataset)
+    return {year: calculate_arrays(sim, year, variables) for year in years}
 
+
+def calculate_arrays(sim, year, variables=SIMULATED_VARIABLES):
+    """Calculate each variable once, by entity, for a built microsimulation.
+
+    variables maps entities to variable names, as from metric_variables.
+    """
     sim.macro_cache_read = False
 
-    # Calculate nationwide metrics
-    net_income = sim.calc("household_net_income", period=year).sum()
+    arrays = {}
+    for entity, entity_variables in variables.items():
+        for variable in entity_variables:
+            values = np.asarray(sim.calculate(variable, period=year, map_to=entity))
+            # Decoded enums come back as objects; store them as strings
+            if values.dtype == object:
+                values = values.astype(str)
+            arrays[f"{entity}.{variable}"] = values
+    return arrays
+
+
+def baseline_store_path(dataset, year):
+    package_version = version("policyengine-us")
+    return os.path.join(BASELINE_STORE, f"{dataset}_{year}_{package_version}.npz")
 
-    poverty = sim.calc("in_poverty", period=year, map_to="person").mean()
 
-    personal_hh_equiv_income = sim.calculate("equiv_household_net_income")
-    household_count_people = sim.calculate("household_count_people")
-    personal_hh_equiv_income.weights *= household_count_people
+def load_baseline_arrays(dataset, year):
+    """Load a dataset's baseline arrays, simulating and storing them on a miss."""
+    path = baseline_store_path(dataset, year)
+    if os.path.exists(path):
+        with np.load(path) as stored:
+            # Stores written before a variable was added are recomputed
+            if SIMULATED_KEYS <= set(stored.files):
+                return {key: stored[key] for key in stored.files}
 
-    return {"net_income": net_income, "poverty_rate": poverty}
+    arrays = simulate_arrays(None, dataset, year)
+    os.makedirs(BASELINE_STORE, exist_ok=True)
+    # Write to a temporary file first so readers never see a partial store
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as file:
+        np.savez(file, **arrays)
+    os.replace(temporary_path, path)
+    return arrays
 
 
-def calculate_reform_impact(reform_params=None, year=2025):
-    """Calculate impact for a single reform against baseline."""
-    # Your existing function remains exactly the same
+def load_arrays(reform_params, dataset, year):
     if reform_params is None:
-        sim = Microsimulation(dataset="pooled_3_year_cps_2023")
+        return load_baseline_arrays(dataset, year)
+    return simulate_arrays(reform_params, dataset, year)
+
+
+def dataset_chunks(dataset, year, chunk_size, system):
+    """Split a dataset's inputs into Datasets of chunk_size households.
+
+    Each chunk reads only its rows of each input from the dataset's file.
+    Datasets keep each entity's rows grouped by household, so a chunk's
+    rows form one range per entity and the file is read about once in
+    total; otherwise the range spanning the chunk's rows is read. Apart
+    from the entity id arrays, memory holds one chunk. Each chunk keeps
+    its households' original weights. system is only used to look up
+    each variable's entity.
+    """
+    import h5py
+    from policyengine_core.data import Dataset
+
+    datasets_by_name = {source.name: source for source in Microsimulation.datasets}
+    source = datasets_by_name[dataset](require=True)
+    person = system.person_entity.key
+    group_entities = [entity.key for entity in system.group_entities]
+
+    with h5py.File(source.file_path, "r") as file:
+
+        def columns(name):
+            """Map each period stored for a variable to its h5 dataset."""
+            node = file[name]
+            if isinstance(node, h5py.Group):
+                return {period: node[period] for period in node}
+            return {str(source.time_period): node}
+
+        def read_ids(name):
+            return next(iter(columns(name).values()))[()]
+
+        def read_rows(column, rows):
+            if not len(rows):
+                return column[0:0]
+            start, stop = rows[0], rows[-1] + 1
+            values = column[start:stop]
+            if len(rows) < stop - start:
+                values = values[rows - start]
+            return values
+
+        entity_ids = {entity: read_ids(f"{entity}_id") for entity in group_entities}
+        memberships = {
+            entity: read_ids(f"{person}_{entity}_id") for entity in group_entities
+        }
+        household_ids = entity_ids["household"]
+        for start in range(0, len(household_ids), chunk_size):
+            members = np.isin(
+                memberships["household"], household_ids[start : start + chunk_size]
+            )
+            rows = {person: np.flatnonzero(members)}
+            for entity in group_entities:
+                rows[entity] = np.flatnonzero(
+                    np.isin(entity_ids[entity], memberships[entity][members])
+                )
+            data = {}
+            for name in file:
+                if name not in system.variables:
+                    continue
+                entity_rows = rows[system.variables[name].entity.key]
+                data[name] = {
+                    period: read_rows(column, entity_rows)
+                    for period, column in columns(name).items()
+                }
+            yield type(
+                "Dataset",
+                (Dataset,),
+                {
+                    "name": f"{dataset}_chunk",
+                    "label": f"{dataset} chunk",
+                    "data_format": Dataset.TIME_PERIOD_ARRAYS,
+                    "file_path": source.file_path,
+                    "time_period": year,
+                    "load": lambda self, data=data: data,
+                },
+            )()
+
+
+def simulate_chunked_sums(reform_params, dataset, year, chunk_size, by_state=True):
+    """Run a microsimulation chunk by chunk, folding each into running sums.
+
+    Only one chunk of chunk_size households is simulated at a time, and
+    its inputs are read from the dataset file without loading the whole
+    dataset, so peak memory follows chunk_size rather than the dataset
+    size. The reform's tax-benefit system is built once and shared by
+    every chunk's simulation. Returns totals for metrics_from_sums.
+    """
+    from policyengine_us import CountryTaxBenefitSystem
+
+    system = CountryTaxBenefitSystem(reform=compile_reform(reform_params))
+    totals = None
+    for chunk in dataset_chunks(dataset, year, chunk_size, system):
+        sim = Microsimulation(tax_benefit_system=system, dataset=chunk)
+        arrays = calculate_arrays(sim, year)
+        totals = add_partial_sums(totals, partial_sums(arrays, by_state))
+    return totals
+
+
+def calculate_nationwide_enhanced(reform_params=None, year=2025, chunk_size=None):
+    """Calculate nationwide metrics using enhanced CPS dataset.
+
+    With chunk_size, the dataset is simulated chunk_size households at a
+    time.
+    """
+    if chunk_size:
+        sums = simulate_chunked_sums(
+            reform_params, NATIONWIDE_DATASET, year, chunk_size, by_state=False
+        )
+        metrics = metrics_from_sums({"Reform": sums})
     else:
-        reform = Reform.from_dict(reform_params, country_id="us")
-        sim = Microsimulation(reform=reform, dataset="pooled_3_year_cps_2023")
+        arrays = load_arrays(reform_params, NATIONWIDE_DATASET, year)
+        metrics = aggregate_metrics({"Reform": arrays}, by_state=False)
+    return metrics.iloc[0].to_dict()
 
-    sim.macro_cache_read = False
 
-    # Calculate metrics
-    net_income = sim.calc("household_net_income", period=year, map_to="household")
-    state_code_household = sim.calc("state_code", period=year, map_to="household")
+def calculate_reform_impact(reform_params=None, year=2025, chunk_size=None):
+    """Calculate state-level metrics for a single reform.
+
+    With chunk_size, the dataset is simulated chunk_size households at a
+    time.
+    """
+    if chunk_size:
+        sums = simulate_chunked_sums(reform_params, STATE_DATASET, year, chunk_size)
+        metrics = metrics_from_sums({"Reform": sums})
+    else:
+        arrays = load_arrays(reform_params, STATE_DATASET, year)
+        metrics = aggregate_metrics({"Reform": arrays})
+    return {"metrics": metrics.droplevel("reform_type")}
 
-    poverty = sim.calc("in_poverty", period=year, map_to="person")
-    state_code_person = sim.calc("state_code", period=year, map_to="person")
 
-    return {
-        "metrics": pd.DataFrame(
-            {
-                "net_income": net_income.groupby(state_code_household).mean(),
-                "poverty": poverty.groupby(state_code_person).mean(),
-            }
+def job_metrics(job_results, dataset, run_names, chunk_size=None):
+    """Aggregate the job results for runs on a dataset into one metrics frame."""
+    results = {run_name: job_results[(dataset, run_name)] for run_name in run_names}
+    if chunk_size:
+        return metrics_from_sums(results)
+    return aggregate_metrics(results, by_state=dataset == STATE_DATASET)
+
+
+def _limit_worker_memory(max_memory_gb):
+    """Cap a worker's address space so one job cannot exhaust the box."""
+    if max_memory_gb is None:
+        return
+    import resource
+
+    limit = int(max_memory_gb * 1024**3)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _run_job(dataset, reform_name, reform_params, year, chunk_size=None):
+    """Run one (dataset, reform) microsimulation in a worker process."""
+    print(f"Calculating {dataset} impacts for {reform_name}...")
+    if isinstance(year, list):
+        return simulate_years(reform_params, dataset, year)
+    if chunk_size:
+        return simulate_chunked_sums(
+            reform_params,
+            dataset,
+            year,
+            chunk_size,
+            by_state=dataset == STATE_DATASET,
         )
-    }
+    return load_arrays(reform_params, dataset, year)
+
+
+def run_jobs(
+    jobs,
+    year,
+    max_workers=DEFAULT_WORKERS,
+    max_memory_gb=None,
+    reforms=REFORMS,
+    chunk_size=None,
+):
+    """Run (dataset, reform name) jobs in a process pool.
+
+    Reform names are looked up in reforms. Each job gets a fresh worker
+    process, capped at max_memory_gb of address space if given. Returns a
+    dict keyed by job, of arrays or, with chunk_size, of chunked sums. If
+    year is a list of years, each job runs one simulation across them and
+    returns a dict of arrays by year.
+    """
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        max_tasks_per_child=1,
+        initializer=_limit_worker_memory,
+        initargs=(max_memory_gb,),
+    ) as executor:
+        futures = {
+            (dataset, reform_name): executor.submit(
+                _run_job,
+                dataset,
+                reform_name,
+                reforms[reform_name],
+                year,
+                chunk_size,
+            )
+            for dataset, reform_name in jobs
+        }
+        return {job: future.result() for job, future in futures.items()}
 
 
-def calculate_all_reform_impacts():
-    """Calculate impacts for all reforms and save to CSV files."""
+def run_intervals(arrays_by_reform, max_memory_gb=None):
+    """Compute impact_intervals in a worker process capped like run_jobs'."""
+    with ProcessPoolExecutor(
+        max_workers=1,
+        initializer=_limit_worker_memory,
+        initargs=(max_memory_gb,),
+    ) as executor:
+        return executor.submit(impact_intervals, arrays_by_reform).result()
+
+
+def reform_fingerprint(reform_params, dataset, year, chunked=False):
+    """Hash everything a reform's result rows depend on.
+
+    Chunked runs approximate Gini from histograms and write state rows
+    without intervals, so their rows get a different fingerprint from
+    exact runs.
+    """
+    payload = json.dumps(
+        {
+            "reform": reform_params,
+            "dataset": dataset,
+            "year": year,
+            "columns": IMPACT_COLUMNS,
+            "mode": "chunked" if chunked else "exact",
+            "intervals": (
+                [BOOTSTRAP_REPLICATES, CONFIDENCE_LEVEL]
+                if dataset == STATE_DATASET and not chunked
+                else None
+            ),
+            "policyengine_us": version("policyengine-us"),
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    with open(MANIFEST_PATH) as file:
+        return json.load(file)
+
+
+def save_manifest(manifest):
+    with open(MANIFEST_PATH, "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+
+
+def stale_reforms(manifest, dataset, results_path, year, force=False, chunked=False):
+    """List the reforms whose rows in a results file are missing or outdated.
+
+    A chunked run also accepts rows from an exact run, which are at least
+    as good; an exact run replaces rows from a chunked run.
+    """
+    recorded = manifest.get(dataset, {}) if os.path.exists(results_path) else {}
+    stale = []
+    for reform_name, reform_params in REFORMS.items():
+        if reform_name == "Baseline":
+            continue
+        current = {reform_fingerprint(reform_params, dataset, year)}
+        if chunked:
+            current.add(reform_fingerprint(reform_params, dataset, year, chunked))
+        if force or recorded.get(reform_name, {}).get("fingerprint") not in current:
+            stale.append(reform_name)
+    return stale
+
+
+def merge_results(results_path, new_rows, reform_names):
+    """Replace the rows for reform_names in a results CSV, keeping the rest.
+
+    Rows for reforms no longer in REFORMS are dropped, and rows are kept
+    in REFORMS order.
+    """
+    merged = new_rows
+    if os.path.exists(results_path):
+        existing = pd.read_csv(results_path)
+        existing = existing[
+            existing["reform_type"].isin(REFORMS)
+            & ~existing["reform_type"].isin(reform_names)
+        ]
+        merged = pd.concat([existing, merged], ignore_index=True)
+
+    order = {reform_name: i for i, reform_name in enumerate(REFORMS)}
+    merged = merged.sort_values(
+        "reform_type", key=lambda column: column.map(order), kind="stable"
+    )
+    merged.to_csv(results_path, index=False)
+    return merged
+
+
+def calculate_all_reform_impacts(
+    max_workers=DEFAULT_WORKERS, max_memory_gb=None, force=False, chunk_size=None
+):
+    """Calculate impacts for changed reforms and merge them into the CSV files.
+
+    Only reforms whose fingerprint differs from the manifest are simulated,
+    unless force is set. State rows also carry bootstrap INTERVAL_COLUMNS.
+    With chunk_size, each microsimulation runs chunk_size households at a
+    time, state rows are written without intervals, and their fingerprints
+    record the chunked mode so a later exact run recomputes them.
+    """
     # Create data directory if it doesn't exist
     if not os.path.exists("data"):
         os.makedirs("data")
 
     year = 2025
 
-    # Calculate nationwide impacts using enhanced CPS
-    print("Calculating nationwide baseline using enhanced CPS...")
-    baseline_enhanced = calculate_nationwide_enhanced(None, year)
+    manifest = load_manifest()
+    stale = {
+        NATIONWIDE_DATASET: stale_reforms(
+            manifest,
+            NATIONWIDE_DATASET,
+            NATIONWIDE_RESULTS_PATH,
+            year,
+            force,
+            chunked=bool(chunk_size),
+        ),
+        STATE_DATASET: stale_reforms(
+            manifest,
+            STATE_DATASET,
+            STATE_RESULTS_PATH,
+            year,
+            force,
+            chunked=bool(chunk_size),
+        ),
+    }
 
-    nationwide_results = []
+    # Every stale (dataset, reform) pair, plus its dataset's baseline, is an
+    # independent job
+    jobs = [
+        (dataset, reform_name)
+        for dataset, reform_names in stale.items()
+        if reform_names
+        for reform_name in ["Baseline", *reform_names]
+    ]
+    job_results = run_jobs(
+        jobs, year, max_workers, max_memory_gb, chunk_size=chunk_size
+    )
 
-    for reform_name, reform_params in REFORMS.items():
-        if reform_name == "Baseline":
+    # Nationwide impacts use the enhanced CPS, state impacts the pooled CPS
+    impacts = {}
+    for dataset, reform_names in stale.items():
+        if not reform_names:
             continue
+        metrics = job_metrics(
+            job_results, dataset, ["Baseline", *reform_names], chunk_size
+        )
+        impacts[dataset] = calculate_impacts(
+            metrics, nationwide=dataset == NATIONWIDE_DATASET
+        )
+        # Small states have few sample households, so state rows also get
+        # bootstrap intervals (chunked runs keep only sums, not households)
+        if dataset == STATE_DATASET and not chunk_size:
+            intervals = run_intervals(
+                {
+                    reform_name: job_results[(dataset, reform_name)]
+                    for reform_name in ["Baseline", *reform_names]
+                },
+                max_memory_gb,
+            )
+            impacts[dataset] = impacts[dataset].merge(
+                intervals, on=["state", "reform_type"]
+            )
 
-        print(f"Calculating nationwide impacts for {reform_name} using enhanced CPS...")
-        reform_enhanced = calculate_nationwide_enhanced(reform_params, year)
-
-        nationwide_results.append(
-            {
-                "reform_type": reform_name,
-                "cost": reform_enhanced["net_income"] - baseline_enhanced["net_income"],
-                "poverty_pct_cut": -(
-                    (
-                        reform_enhanced["poverty_rate"]
-                        - baseline_enhanced["poverty_rate"]
-                    )
-                    / baseline_enhanced["poverty_rate"]
-                    * 100
+    # Merge the recomputed rows into the saved results
+    outputs = [
+        (NATIONWIDE_DATASET, NATIONWIDE_RESULTS_PATH),
+        (STATE_DATASET, STATE_RESULTS_PATH),
+    ]
+    for dataset, results_path in outputs:
+        if not stale[dataset]:
+            print(f"{results_path} is up to date")
+            continue
+        merged = merge_results(results_path, impacts[dataset], stale[dataset])
+        write_columnar(merged, results_path)
+        manifest[dataset] = {
+            reform_name: entry
+            for reform_name, entry in manifest.get(dataset, {}).items()
+            if reform_name in REFORMS
+        }
+        for reform_name in stale[dataset]:
+            manifest[dataset][reform_name] = {
+                "fingerprint": reform_fingerprint(
+                    REFORMS[reform_name], dataset, year, chunked=bool(chunk_size)
                 ),
+                "mode": "chunked" if chunk_size else "exact",
+                "policyengine_us": version("policyengine-us"),
             }
-        )
+        save_manifest(manifest)
+        print(f"Updated {', '.join(stale[dataset])} in {results_path}")
 
-    # Save nationwide results
-    nationwide_df = pd.DataFrame(nationwide_results)
-    nationwide_df.to_csv("data/nationwide_impacts_2025.csv", index=False)
-    print("Nationwide results saved to data/nationwide_impacts_2025.csv")
+    return pd.read_csv(STATE_RESULTS_PATH)
 
-    # Calculate state-level impacts (existing functionality)
-    print("Calculating state-level baseline...")
-    baseline_results = calculate_reform_impact(None, year)
-    baseline_metrics = baseline_results["metrics"]
 
-    state_results = []
+def stack_reforms(reform_dicts):
+    """Combine reform parameter dicts, later reforms taking precedence."""
+    stacked = {}
+    for reform_params in reform_dicts:
+        for parameter, values in reform_params.items():
+            stacked[parameter] = {**stacked.get(parameter, {}), **values}
+    return stacked
 
-    for reform_name, reform_params in REFORMS.items():
-        if reform_name == "Baseline":
-            continue
 
-        print(f"Calculating state-level impacts for {reform_name}...")
-        reform_results = calculate_reform_impact(reform_params, year)
-        reform_metrics = reform_results["metrics"]
+def calculate_stacked_impacts(
+    dataset=NATIONWIDE_DATASET,
+    max_workers=DEFAULT_WORKERS,
+    max_memory_gb=None,
+    stacks=REFORM_STACKS,
+    chunk_size=None,
+):
+    """Calculate individual, marginal and combined impacts of reform packages.
 
-        for state in reform_metrics.index:
-            state_results.append(
-                {
-                    "state": state,
-                    "reform_type": reform_name,
-                    "cost": (
-                        baseline_metrics.loc[state, "net_income"]
-                        - reform_metrics.loc[state, "net_income"]
-                    ),
-                    "poverty_pct_cut": -(
-                        (
-                            reform_metrics.loc[state, "poverty"]
-                            - baseline_metrics.loc[state, "poverty"]
-                        )
-                    )
-                    / baseline_metrics.loc[state, "poverty"]
-                    * 100,
-                }
+    Each package's components are applied cumulatively, so step k runs the
+    first k components together. Step 1 is also the first component's
+    individual run, and the last step is the combined package. Marginal
+    impacts compare each step with the one before it. All runs, including
+    the individual runs of the later components, share one job sweep and
+    one aggregation pass. The impacts are saved to STACKED_RESULTS_PATH.
+    """
+    year = 2025
+    nationwide = dataset == NATIONWIDE_DATASET
+
+    runs = {"Baseline": None}
+    steps = {}
+    for package, components in stacks.items():
+        for reform_name in components:
+            runs[reform_name] = REFORMS[reform_name]
+        steps[package] = [components[0]]
+        for k in range(2, len(components) + 1):
+            step_name = f"{package} (steps 1-{k})"
+            runs[step_name] = stack_reforms(
+                REFORMS[reform_name] for reform_name in components[:k]
             )
+            steps[package].append(step_name)
 
-    # Save state-level results
-    state_results_df = pd.DataFrame(state_results)
-    state_results_df.to_csv("data/reform_impacts_2025.csv", index=False)
-    print("State-level results saved to data/reform_impacts_2025.csv")
+    job_results = run_jobs(
+        [(dataset, run_name) for run_name in runs],
+        year,
+        max_workers,
+        max_memory_gb,
+        reforms=runs,
+        chunk_size=chunk_size,
+    )
+    metrics = job_metrics(job_results, dataset, runs, chunk_size)
+    impacts = calculate_impacts(metrics, nationwide=nationwide)
+
+    def rows(frame, package, step, reform_type, impact):
+        return frame.assign(
+            package=package, step=step, reform_type=reform_type, impact=impact
+        )
+
+    stacked_results = []
+    for package, components in stacks.items():
+        previous = "Baseline"
+        for step, (reform_name, step_name) in enumerate(
+            zip(components, steps[package]), start=1
+        ):
+            individual = impacts[impacts["reform_type"] == reform_name]
+            cumulative = impacts[impacts["reform_type"] == step_name]
+            marginal = calculate_impacts(
+                metrics.loc[[previous, step_name]],
+                nationwide=nationwide,
+                baseline=previous,
+            )
+            stacked_results += [
+                rows(individual, package, step, reform_name, "individual"),
+                rows(marginal, package, step, reform_name, "marginal"),
+                rows(cumulative, package, step, reform_name, "cumulative"),
+            ]
+            previous = step_name
+        stacked_results.append(
+            rows(cumulative, package, len(components), package, "combined")
+        )
+
+    id_columns = ["package", "step", "reform_type", "impact"]
+    if not nationwide:
+        id_columns.append("state")
+    stacked_df = pd.concat(stacked_results, ignore_index=True)[
+        id_columns + IMPACT_COLUMNS
+    ]
+    stacked_df.to_csv(STACKED_RESULTS_PATH, index=False)
+    print(f"Stacked results saved to {STACKED_RESULTS_PATH}")
+    return stacked_df
+
+
+def calculate_multi_year_impacts(
+    years,
+    dataset=NATIONWIDE_DATASET,
+    max_workers=DEFAULT_WORKERS,
+    max_memory_gb=None,
+):
+    """Calculate every reform's impacts in each of years.
+
+    Each reform loads the dataset and builds its simulation once, then is
+    calculated for every year. The impacts are saved in long format, one
+    row per year and reform (and state), to the dataset's
+    MULTI_YEAR_RESULTS_PATHS file.
+    """
+    years = list(years)
+    nationwide = dataset == NATIONWIDE_DATASET
+
+    job_results = run_jobs(
+        [(dataset, reform_name) for reform_name in REFORMS],
+        years,
+        max_workers,
+        max_memory_gb,
+    )
+
+    year_impacts = []
+    for year in years:
+        metrics = aggregate_metrics(
+            {
+                reform_name: job_results[(dataset, reform_name)][year]
+                for reform_name in REFORMS
+            },
+            by_state=not nationwide,
+        )
+        impacts = calculate_impacts(metrics, nationwide=nationwide)
+        year_impacts.append(impacts.assign(year=year))
 
-    return state_results_df
+    id_columns = ["year", "reform_type"]
+    if not nationwide:
+        id_columns.append("state")
+    multi_year_df = pd.concat(year_impacts, ignore_index=True)[
+        id_columns + IMPACT_COLUMNS
+    ]
+    results_path = MULTI_YEAR_RESULTS_PATHS[dataset]
+    multi_year_df.to_csv(results_path, index=False)
+    print(f"Multi-year results saved to {results_path}")
+    return multi_year_df
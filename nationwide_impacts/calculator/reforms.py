@@ -61,3 +61,9 @@ REFORMS = {
     "Trump Social Security Reform": SOCIAL_SECURITY_REFORM,
     "Trump SALT Cap Reform": SALT_CAP_REFORM,
 }
+
+# Packages whose component reforms are applied cumulatively, in this order
+REFORM_STACKS = {
+    "Harris Package": ["Harris CTC Reform", "Harris EITC Reform"],
+    "Trump Package": ["Trump Social Security Reform", "Trump SALT Cap Reform"],
+}
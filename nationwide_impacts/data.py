@@ -0,0 +1,120 @@
+import functools
+import os
+import pyarrow.compute
+import pyarrow.csv
+import pyarrow.feather as feather
+
+NATIONWIDE_IMPACTS_PATH = "data/nationwide_impacts_2025.csv"
+STATE_IMPACTS_PATH = "data/reform_impacts_2025.csv"
+
+
+def columnar_path(csv_path):
+    """Path of the Feather file written alongside a results CSV."""
+    return os.path.splitext(csv_path)[0] + ".feather"
+
+
+def write_columnar(results_df, csv_path):
+    """Write results as an uncompressed Feather file next to their CSV.
+
+    Rows must already be grouped by reform. Leaving the file uncompressed
+    lets readers memory-map it without decoding.
+    """
+    feather.write_feather(
+        results_df.reset_index(drop=True),
+        columnar_path(csv_path),
+        compression="uncompressed",
+    )
+
+
+class ImpactTable:
+    """Impact results with an index from reform (and state) to rows."""
+
+    def __init__(self, table):
+        reform_types = table.column("reform_type").to_pylist()
+        # Group rows by reform, keeping first-seen order, so each reform is
+        # one contiguous zero-copy slice
+        first_seen = {}
+        for reform_type in reform_types:
+            first_seen.setdefault(reform_type, len(first_seen))
+        order = sorted(
+            range(len(reform_types)),
+            key=lambda row: first_seen[reform_types[row]],
+        )
+        if order != list(range(len(reform_types))):
+            table = table.take(order)
+            reform_types = [reform_types[row] for row in order]
+
+        self.table = table
+        self.rows = {}
+        for row, reform_type in enumerate(reform_types):
+            start, _ = self.rows.get(reform_type, (row, row))
+            self.rows[reform_type] = (start, row + 1)
+
+        self.state_rows = {}
+        if "state" in table.column_names:
+            for row, state in enumerate(table.column("state").to_pylist()):
+                self.state_rows[(reform_types[row], state)] = row
+
+    def reform(self, reform_type):
+        start, stop = self.rows[reform_type]
+        return self.table.slice(start, stop - start)
+
+    def row(self, row):
+        return {
+            name: values[0]
+            for name, values in self.table.slice(row, 1).to_pydict().items()
+        }
+
+
+@functools.lru_cache(maxsize=8)
+def _open(path, modified_time):
+    if path.endswith(".feather"):
+        return ImpactTable(feather.read_table(path, memory_map=True))
+    return ImpactTable(pyarrow.csv.read_csv(path))
+
+
+def _source_path(csv_path):
+    """Prefer the Feather file unless the CSV has been written since."""
+    columnar = columnar_path(csv_path)
+    if os.path.exists(columnar):
+        if os.path.getmtime(columnar) >= os.path.getmtime(csv_path):
+            return columnar
+    return csv_path
+
+
+def open_impacts(csv_path):
+    """Return the process-wide ImpactTable for a results file.
+
+    Files are parsed or memory-mapped once per modification time.
+    """
+    path = _source_path(csv_path)
+    return _open(path, os.path.getmtime(path))
+
+
+def get_nationwide(reform_type):
+    """Nationwide impacts of a reform as a dict of column values."""
+    impacts = open_impacts(NATIONWIDE_IMPACTS_PATH)
+    start, _ = impacts.rows[reform_type]
+    return impacts.row(start)
+
+
+def get_state_impacts(reform_type):
+    """State impacts of a reform as a DataFrame, one row per state."""
+    return open_impacts(STATE_IMPACTS_PATH).reform(reform_type).to_pandas()
+
+
+def get_state_impact(reform_type, state):
+    """Impacts of a reform in one state as a dict of column values."""
+    impacts = open_impacts(STATE_IMPACTS_PATH)
+    return impacts.row(impacts.state_rows[(reform_type, state)])
+
+
+def get_state_metric_max(metric_column):
+    """Largest value of a metric across every reform and state."""
+    column = open_impacts(STATE_IMPACTS_PATH).table.column(metric_column)
+    return pyarrow.compute.max(column).as_py()
+
+
+def state_impacts_version():
+    """Modification time of the state impacts, for keying derived caches."""
+    return os.path.getmtime(_source_path(STATE_IMPACTS_PATH))
@@ -1,6 +1,6 @@
 import streamlit as st
-import pandas as pd
 from nationwide_impacts.calculator.reforms import REFORMS
+from nationwide_impacts.data import get_nationwide
 from nationwide_impacts.map import render_reform_map
 from .utils import REFORM_DETAILS, TECHNICAL_NOTES
 
@@ -16,10 +16,6 @@ def render_nationwide_impacts():
     """
     )
 
-    # Load pre-calculated results
-    nationwide_results_df = pd.read_csv("data/nationwide_impacts_2025.csv")
-    state_results_df = pd.read_csv("data/reform_impacts_2025.csv")
-
     # Create columns for selectors
     col1, col2 = st.columns(2)
 
@@ -46,10 +42,8 @@ def render_nationwide_impacts():
     st.session_state.selected_metric = selected_metric_name
     st.session_state.selected_metric_column = METRICS[selected_metric_name]
 
-    # Filter results for selected reform
-    nationwide_reform_results = nationwide_results_df[
-        nationwide_results_df["reform_type"] == selected_reform
-    ].iloc[0]
+    # Look up pre-calculated results for the selected reform
+    nationwide_reform_results = get_nationwide(selected_reform)
 
     # Add map visualization
     render_reform_map()
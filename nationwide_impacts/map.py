@@ -1,6 +1,10 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from nationwide_impacts.data import (
+    get_state_impacts,
+    get_state_metric_max,
+    state_impacts_version,
+)
 
 
 def get_metric_range(data, metric_column):
@@ -8,24 +12,17 @@ def get_metric_range(data, metric_column):
     return data[metric_column].max()
 
 
-def render_reform_map():
-    """Renders a map visualization of reform impacts by state."""
-
-    # Load data from session state
-    if "data" not in st.session_state:
-        st.session_state.data = pd.read_csv("data/reform_impacts_2025.csv")
-    data = st.session_state.data
-
-    # Get selected values from session state
-    selected_reform = st.session_state.selected_reform
-    selected_metric_name = st.session_state.selected_metric
-    metric_column = st.session_state.selected_metric_column
+@st.cache_resource(show_spinner=False, max_entries=64)
+def build_reform_map(selected_reform, selected_metric_name, metric_column, version):
+    """Build the choropleth for a reform and metric once per data version.
 
-    # Filter data for selected reform
-    reform_data = data[data["reform_type"] == selected_reform].copy()
+    Figures are shared by every session and must not be modified.
+    """
+    # Look up the selected reform's rows
+    reform_data = get_state_impacts(selected_reform)
 
     # Get the maximum value for the selected metric across all reforms
-    max_value = data[metric_column].max()
+    max_value = get_state_metric_max(metric_column)
 
     # Create hover text with all metrics
     reform_data["hover_text"] = (
@@ -74,6 +71,25 @@ def render_reform_map():
         hovertemplate="%{customdata[0]}<extra></extra>",
     )
 
+    return fig
+
+
+def render_reform_map():
+    """Renders a map visualization of reform impacts by state."""
+
+    # Get selected values from session state
+    selected_reform = st.session_state.selected_reform
+    selected_metric_name = st.session_state.selected_metric
+    metric_column = st.session_state.selected_metric_column
+
+    # Reuse the cached figure for this reform and metric
+    fig = build_reform_map(
+        selected_reform,
+        selected_metric_name,
+        metric_column,
+        state_impacts_version(),
+    )
+
     # Render with container width
     st.plotly_chart(
         fig,